@@ -0,0 +1,61 @@
+#label parity and per-face cost between two emotion backends
+#
+#   cd o
+#   python -m benchmarks.backend_parity --reference deepface --candidate onnx --video interview.mp4
+#   EMOTION_MODEL_QUANTIZED=1 python -m benchmarks.backend_parity --candidate onnx --video interview.mp4
+#
+# Faces come from the same locate_face() the server uses; exits 1 below --min-agreement.
+
+import argparse
+import json
+import sys
+import time
+
+from utils.backend_utils import build_emotion_backend, compare_backends
+from utils.emotion_utils import locate_face
+from utils.video_utils import iter_sampled_frames
+
+def collect_faces(video_path, sample_seconds, limit):
+    faces = []
+    for _, _, frame in iter_sampled_frames(video_path, sample_seconds):
+        face, _, _, _ = locate_face(frame)
+        if face is not None:
+            faces.append(face)
+        if len(faces) >= limit:
+            break
+    return faces
+
+def cost_per_face(backend, faces, batch_size):
+    started = time.perf_counter()
+    for start in range(0, len(faces), batch_size):
+        backend.predict(faces[start:start + batch_size])
+    return round((time.perf_counter() - started) * 1000 / len(faces), 3)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two emotion backends on the same faces.")
+    parser.add_argument("--reference", default="deepface")
+    parser.add_argument("--candidate", default="onnx")
+    parser.add_argument("--video", required=True)
+    parser.add_argument("--sample-seconds", type=float, default=0.5)
+    parser.add_argument("--faces", type=int, default=300, help="stop after this many faces")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--min-agreement", type=float, default=0.9)
+    args = parser.parse_args(argv)
+
+    faces = collect_faces(args.video, args.sample_seconds, args.faces)
+    if not faces:
+        print("No faces found in the video.")
+        return 1
+
+    reference = build_emotion_backend(args.reference)
+    candidate = build_emotion_backend(args.candidate)
+    report = compare_backends(reference, candidate, faces, args.batch_size)
+    report['ms_per_face'] = {
+        args.reference: cost_per_face(reference, faces, args.batch_size),
+        args.candidate: cost_per_face(candidate, faces, args.batch_size),
+    }
+    print(json.dumps(report, indent=2))
+    return 0 if report['agreement'] >= args.min_agreement else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
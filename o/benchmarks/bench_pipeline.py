@@ -0,0 +1,201 @@
+#stage-level micro-benchmarks for the frame pipeline
+#
+#   cd o
+#   python -m benchmarks.bench_pipeline --stub-models --output bench.json
+#   python -m benchmarks.bench_pipeline --stub-models --baseline bench.json
+#
+# Each stage is timed on its own over synthetic frames (or --video frames) at several
+# resolutions; throughput, p50/p95/p99 latency and peak traced memory go to JSON.
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import cv2
+import numpy as np
+
+from utils.stub_models import install_stub_models
+
+DEFAULT_RESOLUTIONS = "320x240,640x480,1280x720"
+
+# --- Inputs ---
+def synthetic_frames(width, height, count, seed=0):
+    # Noise with a bright ellipse roughly where an interviewee's face would be
+    rng = np.random.default_rng(seed)
+    frames = []
+    for _ in range(count):
+        frame = rng.integers(0, 80, (height, width, 3), dtype=np.uint8)
+        cv2.ellipse(frame, (width // 2, height // 3), (width // 8, height // 6), 0, 0, 360, (190, 170, 150), -1)
+        frames.append(frame)
+    return frames
+
+def video_frames(path, width, height, count):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.resize(frame, (width, height)))
+    cap.release()
+    if not frames:
+        raise ValueError(f"No frames read from {path}")
+    return frames
+
+# --- Stages ---
+def build_stages(frames):
+    """(name, fn, inputs) per stage. Imports happen here so --stub-models is in place first."""
+    from utils.decode_utils import decode_frame
+    from utils.emotion_utils import preprocess_frame, predict_emotions, FramePreprocessor
+    from utils.face_utils import detect_faces
+    from utils.pose_utils import get_pose_results, estimate_pose, classify_posture
+    from utils.feedback_utils import get_feedback, summarize_emotions
+    from utils.session_utils import Session
+    from utils.summary_utils import generate_session_summary
+
+    encoded = [cv2.imencode(".jpg", frame)[1].tobytes() for frame in frames]
+    preprocessed = [preprocess_frame(frame) for frame in frames]
+    preprocessor = FramePreprocessor()
+    detect_grays = [preprocessor.run(frame)[1].copy() for frame in frames]
+    faces = [cv2.resize(frame[120:360, 200:440], (224, 224)) for frame in preprocessed]
+    rgbs = [cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) for frame in frames]
+    history = ["happy", "calm", "sad", "No face detected", "neutral"] * 6
+
+    session = Session("bench", datetime.now() - timedelta(minutes=30))
+    for i in range(3600):
+        session.stats.add_emotion(history[i % len(history)])
+        session.stats.add_posture("Upright")
+
+    def pose(rgb):
+        results = get_pose_results(rgb)
+        return classify_posture(results) if results.pose_landmarks else "Unknown"
+
+    def pose_upper_body(frame):
+        # What a live frame pays: BGR in, downscaled head-and-shoulders region around the face box
+        results = estimate_pose(frame, face_box=(200, 120, 240, 240))
+        return classify_posture(results) if results.pose_landmarks else "Unknown"
+
+    def feedback(_):
+        get_feedback("happy", "Slouching")
+        return summarize_emotions(history)
+
+    batches = [faces[i:i + 16] for i in range(0, len(faces), 16)] or [faces]
+
+    return [
+        ("decode_frame", decode_frame, encoded),
+        ("preprocess_frame", preprocess_frame, frames),
+        ("fused_preprocess", preprocessor.run, frames),
+        ("cascade_detection", detect_faces, detect_grays),
+        ("emotion_model", lambda face: predict_emotions([face]), faces),
+        ("emotion_model_batch16", predict_emotions, batches),
+        ("pose", pose, rgbs),
+        ("pose_upper_body", pose_upper_body, frames),
+        ("feedback", feedback, frames),
+        ("session_summary", lambda _: generate_session_summary(session, datetime.now()), frames),
+    ]
+
+# --- Measurement ---
+def measure(fn, inputs, iterations, warmup=3):
+    for i in range(min(warmup, iterations)):
+        fn(inputs[i % len(inputs)])
+
+    latencies = np.empty(iterations)
+    started = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        fn(inputs[i % len(inputs)])
+        latencies[i] = time.perf_counter() - t0
+    elapsed = time.perf_counter() - started
+
+    # Memory in a separate, shorter pass so tracing doesn't skew the timings
+    tracemalloc.start()
+    for i in range(min(10, iterations)):
+        fn(inputs[i % len(inputs)])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    ms = latencies * 1000
+    return {
+        'iterations': iterations,
+        'throughput_per_s': round(iterations / elapsed, 2),
+        'p50_ms': round(float(np.percentile(ms, 50)), 3),
+        'p95_ms': round(float(np.percentile(ms, 95)), 3),
+        'p99_ms': round(float(np.percentile(ms, 99)), 3),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+def run(args):
+    results = {}
+    for resolution in args.resolutions.split(","):
+        width, height = (int(v) for v in resolution.lower().split("x"))
+        if args.video:
+            frames = video_frames(args.video, width, height, args.frames)
+        else:
+            frames = synthetic_frames(width, height, args.frames)
+
+        for name, fn, inputs in build_stages(frames):
+            if args.stages and name not in args.stages:
+                continue
+            key = f"{name}@{resolution}"
+            results[key] = measure(fn, inputs, args.iterations)
+            print(f"{key:<36} {results[key]['throughput_per_s']:>10.1f}/s  "
+                  f"p50 {results[key]['p50_ms']:>8.3f}ms  p95 {results[key]['p95_ms']:>8.3f}ms  "
+                  f"p99 {results[key]['p99_ms']:>8.3f}ms  peak {results[key]['peak_memory_kb']:>9.1f}KB")
+    return results
+
+def compare(results, baseline, tolerance):
+    """Stages whose p50 or p95 got slower than the baseline by more than `tolerance`."""
+    regressions = []
+    for key, current in results.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            if before[metric] and current[metric] > before[metric] * (1 + tolerance):
+                regressions.append(f"{key} {metric}: {before[metric]:.3f} -> {current[metric]:.3f}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-stage benchmarks for the frame pipeline.")
+    parser.add_argument("--stub-models", action="store_true", help="use stand-in emotion/pose models (offline, no weights)")
+    parser.add_argument("--video", help="take frames from this recording instead of synthetic ones")
+    parser.add_argument("--resolutions", default=DEFAULT_RESOLUTIONS)
+    parser.add_argument("--frames", type=int, default=32, help="distinct input frames per resolution")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--stages", nargs="*", help="only run these stages")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="compare against a previous results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown vs. baseline (0.15 = 15%%)")
+    args = parser.parse_args(argv)
+
+    if args.stub_models:
+        install_stub_models()
+
+    results = run(args)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                'created': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                'python': platform.python_version(),
+                'opencv': cv2.__version__,
+                'stub_models': args.stub_models,
+                'results': results,
+            }, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+#live-session load generator: N simulated browser clients against a running server
+#
+#   cd o
+#   python -m benchmarks.loadgen --serve --stub-models --clients 1,5,10,20 --fps 2 --duration 30
+#   python -m benchmarks.loadgen --url http://10.0.0.5:8000 --clients 50 --video interview.mp4 --output load.json
+#
+# Each client connects over socket.io, sends start_session, streams JPEG frames at --fps through
+# the "frame" event, and times each frame until its "feedback" (matched by seq) comes back, then
+# sends end_session. Concurrency levels run one after another; for each the report has throughput,
+# latency percentiles, unanswered/errored frames and the server's memory from /metrics.
+# Needs python-socketio's async client extras: pip install "python-socketio[asyncio_client]"
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks.bench_pipeline import synthetic_frames, video_frames
+
+# --- Frames ---
+def load_frames(args):
+    if args.video:
+        frames = video_frames(args.video, args.width, args.height, args.frames)
+    else:
+        frames = synthetic_frames(args.width, args.height, args.frames)
+    quality = [cv2.IMWRITE_JPEG_QUALITY, args.jpeg_quality]
+    return [cv2.imencode(".jpg", frame, quality)[1].tobytes() for frame in frames]
+
+# --- Server ---
+async def fetch_text(url):
+    import aiohttp
+    async with aiohttp.ClientSession() as http:
+        async with http.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+            return response.status, await response.text()
+
+async def server_memory(url):
+    """Resident bytes of the server process and its workers, from /metrics (None if unavailable)."""
+    try:
+        _, text = await fetch_text(f"{url}/metrics")
+    except Exception:
+        return None
+    memory = dict(re.findall(r'process_resident_memory_bytes\{process="(\w+)"\} ([0-9.e+]+)', text))
+    return {name: int(float(value)) for name, value in memory.items()} or None
+
+async def wait_ready(url, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            status, _ = await fetch_text(f"{url}/ready")
+            if status == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.5)
+    raise TimeoutError(f"{url} not ready after {timeout}s")
+
+def start_server(args):
+    # Same command as the README, from o/, with stand-in models if asked
+    env = dict(os.environ)
+    if args.stub_models:
+        env.update(EMOTION_BACKEND="stub", POSE_BACKEND="stub")
+    port = args.url.rsplit(":", 1)[-1].strip("/")
+    log = open(args.server_log, "w", encoding="utf-8") if args.server_log else subprocess.DEVNULL
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:socket_app", "--host", "127.0.0.1", "--port", port, "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+
+# --- Client ---
+class SimulatedClient:
+    def __init__(self, url, frames, fps, follow_server_rate, offset):
+        self.url = url
+        self.frames = frames
+        self.interval = 1.0 / fps
+        self.follow_server_rate = follow_server_rate
+        self.offset = offset            # clients start on different frames
+        self.pending = {}               # seq -> send time
+        self.latencies = []
+        self.sent = self.errors = self.server_dropped = self.restarts = 0
+        self.connect_error = None
+        self.streaming_since = self.last_feedback = None
+        self.configured = asyncio.Event()
+        self.ended = asyncio.Event()
+        self.ending = False
+
+    async def run(self, duration, drain_seconds):
+        import socketio
+        sio = socketio.AsyncClient(reconnection=False)
+
+        @sio.on('session_config')
+        async def on_config(config):
+            self.configured.set()
+
+        @sio.on('feedback')
+        async def on_feedback(data):
+            sent_at = self.pending.pop(data.get('seq'), None)
+            if sent_at is not None:
+                self.last_feedback = time.perf_counter()
+                self.latencies.append(self.last_feedback - sent_at)
+            if data.get('emotion') == 'Error':
+                self.errors += 1
+            self.server_dropped = max(self.server_dropped, data.get('dropped_frames') or 0)
+            capture = data.get('capture')
+            if self.follow_server_rate and capture:
+                self.interval = capture['interval_ms'] / 1000
+
+        @sio.on('session_summary')
+        async def on_summary(summary):
+            if self.ending:
+                self.ended.set()
+                return
+            # The server ended the session on its own (e.g. no face for a while): start another
+            self.restarts += 1
+            self.configured.clear()
+            await sio.emit('start_session')
+
+        try:
+            await sio.connect(self.url, transports=["websocket"])
+        except Exception as e:
+            self.connect_error = str(e)
+            return
+        try:
+            await sio.emit('start_session')
+            await asyncio.wait_for(self.configured.wait(), 10)
+            stop_at = time.monotonic() + duration
+            self.streaming_since = time.perf_counter()
+            index = self.offset
+            while time.monotonic() < stop_at:
+                await self.configured.wait()
+                tick = time.monotonic()
+                seq = self.sent
+                self.pending[seq] = time.perf_counter()
+                await sio.emit('frame', {'image': self.frames[index % len(self.frames)], 'seq': seq, 'ts': int(time.time() * 1000)})
+                self.sent += 1
+                index += 1
+                await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - tick)))
+
+            # Give in-flight frames a moment, then end the session like the browser does
+            drain_until = time.monotonic() + drain_seconds
+            while self.pending and time.monotonic() < drain_until:
+                await asyncio.sleep(0.05)
+            self.ending = True
+            await sio.emit('end_session')
+            try:
+                await asyncio.wait_for(self.ended.wait(), 10)
+            except asyncio.TimeoutError:
+                pass
+        except Exception as e:
+            self.connect_error = self.connect_error or str(e)
+        finally:
+            await sio.disconnect()
+
+# --- Report ---
+def percentiles(latencies):
+    if not latencies:
+        return {'p50_ms': None, 'p95_ms': None, 'p99_ms': None, 'max_ms': None}
+    ms = np.array(latencies) * 1000
+    return {
+        'p50_ms': round(float(np.percentile(ms, 50)), 1),
+        'p95_ms': round(float(np.percentile(ms, 95)), 1),
+        'p99_ms': round(float(np.percentile(ms, 99)), 1),
+        'max_ms': round(float(ms.max()), 1),
+    }
+
+async def client_start(client, index, args):
+    # Stagger connects so a level doesn't open with one thundering burst
+    await asyncio.sleep(index * args.ramp_seconds)
+    await client.run(args.duration, args.drain_seconds)
+
+async def run_level(args, frames, clients):
+    memory_before = await server_memory(args.url)
+    simulated = [
+        SimulatedClient(args.url, frames, args.fps, args.follow_server_rate, offset=i * 7)
+        for i in range(clients)
+    ]
+    await asyncio.gather(*(client_start(client, i, args) for i, client in enumerate(simulated)))
+    # Throughput over the streaming window only, not connects, draining and end_session
+    starts = [client.streaming_since for client in simulated if client.streaming_since is not None]
+    ends = [client.last_feedback for client in simulated if client.last_feedback is not None]
+    elapsed = max(ends) - min(starts) if starts and ends else 0.0
+    memory_after = await server_memory(args.url)
+
+    latencies = [latency for client in simulated for latency in client.latencies]
+    sent = sum(client.sent for client in simulated)
+    answered = len(latencies)
+    return {
+        'clients': clients,
+        'connect_failures': sum(1 for client in simulated if client.connect_error),
+        'frames_sent': sent,
+        'frames_answered': answered,
+        'frames_unanswered': sum(len(client.pending) for client in simulated),
+        'frames_errored': sum(client.errors for client in simulated),
+        'frames_dropped_by_server': sum(client.server_dropped for client in simulated),
+        'session_restarts': sum(client.restarts for client in simulated),
+        'throughput_fps': round(answered / elapsed, 2) if elapsed else 0.0,
+        'offered_fps': round(clients * args.fps, 2),
+        **percentiles(latencies),
+        'server_memory_before': memory_before,
+        'server_memory_after': memory_after,
+    }
+
+def format_row(result):
+    memory = result['server_memory_after'] or {}
+    mb = sum(memory.values()) / 1e6 if memory else float('nan')
+    latency = "  ".join(f"{key[:-3]} {result[key] if result[key] is not None else '-':>7}" for key in ('p50_ms', 'p95_ms', 'p99_ms'))
+    return (f"{result['clients']:>5} clients  {result['throughput_fps']:>8.1f}/{result['offered_fps']:<7} fps  {latency} ms  "
+            f"unanswered {result['frames_unanswered']:>5}  errors {result['frames_errored']:>4}  "
+            f"server-dropped {result['frames_dropped_by_server']:>5}  mem {mb:8.1f}MB")
+
+async def run(args):
+    frames = load_frames(args)
+    results = []
+    for clients in (int(n) for n in args.clients.split(",")):
+        result = await run_level(args, frames, clients)
+        results.append(result)
+        print(format_row(result), flush=True)
+        await asyncio.sleep(args.pause_seconds)   # let queues and logs settle between levels
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulated live-session clients for load testing.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--serve", action="store_true", help="start a local server for the run and stop it afterwards")
+    parser.add_argument("--stub-models", action="store_true", help="with --serve: stand-in emotion/pose models")
+    parser.add_argument("--server-log", help="with --serve: write the server's output here")
+    parser.add_argument("--clients", default="1,5,10,20", help="comma-separated concurrency levels")
+    parser.add_argument("--fps", type=float, default=2.0, help="frames per second per client")
+    parser.add_argument("--follow-server-rate", action="store_true", help="obey the capture interval the server asks for")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of streaming per level")
+    parser.add_argument("--drain-seconds", type=float, default=5.0, help="wait this long for outstanding feedback")
+    parser.add_argument("--ramp-seconds", type=float, default=0.05, help="delay between client connects")
+    parser.add_argument("--pause-seconds", type=float, default=2.0)
+    parser.add_argument("--video", help="replay frames from this file instead of synthetic ones")
+    parser.add_argument("--frames", type=int, default=60, help="distinct frames to cycle through")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--jpeg-quality", type=int, default=80)
+    parser.add_argument("--output", help="write results JSON here")
+    args = parser.parse_args(argv)
+    args.url = args.url.rstrip("/")
+
+    server = start_server(args) if args.serve else None
+    try:
+        asyncio.run(wait_ready(args.url, timeout=120))
+        results = asyncio.run(run(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,41 @@
 import socketio
 import uvicorn
-import cv2
 from datetime import datetime
 import asyncio
 import logging
+import time
+import json
 from fastapi.responses import RedirectResponse
 from fastapi.staticfiles import StaticFiles
-import shutil
 import tempfile
 import os
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse
+from typing import Optional
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Depends, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-from utils.decode_utils import decode_frame
-from utils.emotion_utils import classify_emotion
-from utils.pose_utils import get_pose_results, classify_posture
-from utils.feedback_utils import summarize_emotions, get_feedback
-
-from utils.session_utils import get_session_id, get_session_template
-from utils.logging_utils import initialize_log_file, log_to_csv, save_session_summary
+from utils.inference_utils import InferencePool, LatestFrameQueue, analyze_encoded_frame
+from utils.pose_utils import release_pose_session
+from utils.batch_utils import EmotionBatcher, resolve_emotion
+from utils.face_utils import FaceTracker
+from utils.cache_utils import FrameResultCache
+from utils.rate_utils import AdaptiveRate
+from utils.decode_utils import parse_frame_payload
+from utils.config_utils import (
+    CAPTURE_WIDTH, CAPTURE_HEIGHT, CAPTURE_INTERVAL_MS, CAPTURE_JPEG_QUALITY, VIDEO_SAMPLE_SECONDS, FRAME_LOG_SAMPLE_EVERY, PRELOAD_MODELS,
+    SESSION_PUBLISH_SECONDS, JOB_WORKERS
+)
+from utils.metrics_utils import (
+    metrics, observe_stages, stage_timer, frame_seconds, frames_total, frames_dropped, frame_errors, cache_lookups
+)
+from utils.video_utils import save_upload
+from utils.job_utils import JobManager, replay_records, normalize_summary
+from utils.feedback_utils import get_feedback
+
+from utils.session_utils import Session, SessionStore, get_session_id
+from utils.state_utils import NODE_ID, build_state_backend, build_client_manager
+from utils.logging_utils import initialize_log_file, log_to_csv, close_log_writers, get_log_writer
+from utils.store_utils import get_analytics_store, close_analytics_store
 from utils.summary_utils import generate_session_summary
 from utils.cleanup_utils import cleanup_inactive_sessions
 
@@ -29,7 +45,8 @@ logger = logging.getLogger("interview_analyzer")
 
 # --- Setup and Configs ---
 app = FastAPI()
-sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*')
+# With REDIS_URL set, emits go through Redis so any worker can reach any client
+sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*', client_manager=build_client_manager())
 socket_app = socketio.ASGIApp(sio, other_asgi_app=app)
 
 app.add_middleware(
@@ -45,122 +62,317 @@ app.mount("/templates", StaticFiles(directory="templates"), name="templates")
 UPLOAD_DIR = "uploaded_videos"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-active_sessions = {}
-session_lock = asyncio.Lock()
+sessions = SessionStore()
+state_backend = build_state_backend()   # what other workers see: session listings and summaries
+
+inference_pool = InferencePool()
+job_pool = InferencePool(workers=JOB_WORKERS)   # upload segments, kept off the live frames' workers
+readiness = {'ready': not PRELOAD_MODELS, 'workers_warm': 0, 'warm_up_seconds': None, 'error': None}
+emotion_batcher = EmotionBatcher(inference_pool)
+job_manager = JobManager(job_pool)   # jobs live in this process: /jobs/* needs sticky routing across workers
+background_tasks = set()   # keep references to fire-and-forget tasks until they finish
 
 log_file = "feedback_log.csv"
 initialize_log_file(log_file)
+analytics = get_analytics_store()   # summaries + frame records for reporting
 
 # --- Socket Events ---
 @sio.on('connect')
 async def connect(sid, environ):
     logger.info(f"Client {sid} connected")
-    async with session_lock:
-        active_sessions[sid] = get_session_template()
+    async with sessions.lock(sid):
+        sessions.put(sid, Session())
 
 @sio.on('disconnect')
 async def disconnect(sid):
     logger.info(f"Client {sid} disconnected")
-    async with session_lock:
-        if sid in active_sessions:
-            del active_sessions[sid]
+    async with sessions.lock(sid):
+        session = sessions.pop(sid)
+        if session is not None:
+            stop_frame_worker(session)
+    await unshare_session(sid)
 
 @sio.on('start_session')
 async def start_session(sid):
-    async with session_lock:
-        active_sessions[sid] = get_session_template()
-        session = active_sessions[sid]
-        session['session_active'] = True
-        session['session_id'] = get_session_id()
-        session['start_time'] = datetime.now()
-
-    initialize_log_file(log_file)
-
-    logger.info(f"Started session {session['session_id']} for client {sid}")
-    timestamp = session['start_time'].strftime("%Y-%m-%d %H:%M:%S")
-    await log_to_csv([session['session_id'], timestamp, "SESSION_START", "", "Session started"], log_file)
+    async with sessions.lock(sid):
+        previous = sessions.get(sid)
+        if previous is not None:
+            stop_frame_worker(previous)
+        session = Session(get_session_id(), datetime.now())
+        session.session_active = True
+        session.frame_queue = LatestFrameQueue()
+        session.face_tracker = FaceTracker()
+        session.result_cache = FrameResultCache()
+        session.rate = AdaptiveRate()
+        session.frame_task = asyncio.create_task(run_frame_worker(sid, session))
+        sessions.put(sid, session)
+
+    logger.info(f"Started session {session.session_id} for client {sid}")
+    await share_sessions({sid: session})
+    await sio.emit('session_config', {
+        'binary_frames': True,
+        'capture': {
+            'width': CAPTURE_WIDTH,
+            'height': CAPTURE_HEIGHT,
+            'interval_ms': CAPTURE_INTERVAL_MS,
+            'jpeg_quality': CAPTURE_JPEG_QUALITY
+        }
+    }, to=sid)
+    timestamp = session.start_time.strftime("%Y-%m-%d %H:%M:%S")
+    await log_to_csv([session.session_id, timestamp, "SESSION_START", "", "Session started"], log_file)
 
 @sio.on('end_session')
 async def end_session(sid):
-    async with session_lock:
-        if sid not in active_sessions or not active_sessions[sid]['session_active']:
+    session = sessions.get(sid)
+    if session is None:
+        return
+    async with session.lock:
+        if not session.session_active:
             return
-
-        session = active_sessions[sid]
-        session['session_active'] = False
+        session.session_active = False
         end_time = datetime.now()
+        stop_frame_worker(session)
+        sessions.schedule_expiry(sid, session)
 
     summary = generate_session_summary(session, end_time)
-    save_session_summary(session['session_id'], summary)
+    await analytics.save_summary(summary, source="live")
+    await share_summary(session.session_id, summary)
+    await share_sessions({sid: session})
 
     timestamp = end_time.strftime("%Y-%m-%d %H:%M:%S")
-    await log_to_csv([session['session_id'], timestamp, "SESSION_END", "", f"Session ended. Duration: {summary['duration']}"], log_file)
+    await log_to_csv([session.session_id, timestamp, "SESSION_END", "", f"Session ended. Duration: {summary['duration']}"], log_file)
 
-    logger.info(f"Ended session {session['session_id']} for client {sid}")
+    logger.info(f"Ended session {session.session_id} for client {sid}")
     await sio.emit('session_summary', summary, to=sid)
 
 @sio.on('frame')
 async def process_frame(sid, data):
-    async with session_lock:
-        if sid not in active_sessions or not active_sessions[sid]['session_active']:
-            return
-        session = active_sessions[sid]
+    # Only enqueue here; the session's frame worker does the analysis off the loop.
+    # No lock: the lookup doesn't yield, so nothing can change the session under us.
+    session = sessions.get(sid)
+    if session is None or not session.session_active:
+        return
+
+    queue = session.frame_queue
+    dropped = queue.dropped
+    queue.put(data)
+    if queue.dropped > dropped:
+        frames_dropped.inc()
+        logger.debug(f"Session {session.session_id} - dropped stale frame ({queue.dropped} total)")
+
+# --- Frame Workers ---
+async def run_frame_worker(sid, session):
+    queue = session.frame_queue
+    while session.session_active:
+        data = await queue.get()
+        if not session.session_active:
+            break
+        await analyze_session_frame(sid, session, data)
+
+def stop_frame_worker(session):
+    task = session.frame_task
+    if task and task is not asyncio.current_task():
+        task.cancel()
+    session.frame_task = None
+    if task and session.session_id:
+        release = asyncio.create_task(release_pose_graph(session.session_id))
+        background_tasks.add(release)
+        release.add_done_callback(background_tasks.discard)
+
+async def release_pose_graph(session_id):
+    # Close the session's pose graph on the worker that holds it
+    try:
+        await inference_pool.run(release_pose_session, session_id, key=session_id)
+    except Exception as e:
+        logger.warning(f"Session {session_id} - pose graph not released: {e}")
 
+async def analyze_session_frame(sid, session, data):
+    seq = client_ts = None
+    started = time.monotonic()
     try:
-        frame = decode_frame(data['image'])
-        emotion, lighting_feedback, center_feedback = classify_emotion(frame)
+        image, seq, client_ts = parse_frame_payload(data)
+        cache = session.result_cache
+        session_id = session.session_id
+        analysis = await inference_pool.run(
+            analyze_encoded_frame, image, session.face_tracker, cache.lookup_reference(), cache.tolerance, session_id,
+            key=session_id,   # same worker every frame, where this session's pose graph lives
+        )
+        session.face_tracker = analysis['tracker']
+        observe_stages(analysis['timings'])
+        stats = session.stats
+
+        cache_lookups.inc(result="hit" if analysis['unchanged'] else "miss")
+        if analysis['unchanged']:
+            # Near-duplicate of the last analysed frame: reuse its result
+            emotion, posture, feedback = cache.hit()
+            feedback = list(feedback)
+        else:
+            emotion = await resolve_emotion(emotion_batcher, analysis, stats)
+            posture = analysis['posture']
+            lighting_feedback, center_feedback = analysis['lighting_feedback'], analysis['center_feedback']
+
+            feedback = get_feedback(emotion, posture)
+            if lighting_feedback:
+                feedback.append(lighting_feedback)
+            if center_feedback:
+                feedback.append(center_feedback)
+            cache.store(analysis['signature'], (emotion, posture, tuple(feedback)))
+
+        # Reused results still count as a frame, so trends and the no-face check behave as before
         if emotion != "Unknown":
-            session['emotion_history'].append(emotion)
-
-        posture = "Unknown"
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        pose_results = get_pose_results(frame_rgb)
-        if pose_results.pose_landmarks:
-            posture = classify_posture(pose_results)
-            session['posture_history'].append(posture)
+            stats.add_emotion(emotion)
+        if posture != "Unknown":
+            stats.add_posture(posture)
 
-        feedback = get_feedback(emotion, posture)
-        if lighting_feedback:
-            feedback.append(lighting_feedback)
-        if center_feedback:
-            feedback.append(center_feedback)
-
-        emotion_summary = summarize_emotions(list(session['emotion_history'])[-30:])
-        session['feedback_count'] += 1
+        emotion_summary = stats.trend_summary()
+        session.feedback_count += 1
 
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        await log_to_csv([session['session_id'], timestamp, emotion, posture, "; ".join(feedback)], log_file)
-
-        logger.info(f"Session {session['session_id']} - Emotion: {emotion} | Posture: {posture} | Feedback: {feedback}")
-        logger.info(f"Trend Summary: {emotion_summary}")
-
-        if list(session['emotion_history'])[-30:].count("No face detected") == 30:
-            logger.info(f"Ending session {session['session_id']} due to prolonged 'No face detected'")
+        row = [session.session_id, timestamp, emotion, posture, "; ".join(feedback)]
+        await log_to_csv(row, log_file)
+        analytics.add_frame(row)
+
+        # Per-frame logging is DEBUG; INFO only gets a sample so logging doesn't cost throughput
+        level = logging.INFO if session.feedback_count % FRAME_LOG_SAMPLE_EVERY == 1 else logging.DEBUG
+        if logger.isEnabledFor(level):
+            logger.log(level, f"Session {session.session_id} - Emotion: {emotion} | Posture: {posture} | Feedback: {feedback}")
+            logger.log(level, f"Trend Summary: {emotion_summary}")
+
+        if stats.no_face_streak >= 30:
+            logger.info(f"Ending session {session.session_id} due to prolonged 'No face detected'")
             await end_session(sid)
             return
 
-        await sio.emit('feedback', {
-            'emotion': emotion,
-            'posture': posture,
-            'feedback': feedback,
-            'emotion_trend': emotion_summary,
-            'session_active': True
-        }, to=sid)
+        queue = session.frame_queue
+        rate = session.rate
+        rate.observe((time.monotonic() - started) * 1000, len(queue), queue.dropped, inference_pool.load())
+
+        with stage_timer("emit"):
+            await sio.emit('feedback', {
+                'emotion': emotion,
+                'posture': posture,
+                'feedback': feedback,
+                'emotion_trend': emotion_summary,
+                'dropped_frames': queue.dropped,
+                'capture': rate.target(),
+                'seq': seq,
+                'client_ts': client_ts,
+                'session_active': True
+            }, to=sid)
+        frames_total.inc()
+        frame_seconds.observe(time.monotonic() - started)
 
     except Exception as e:
-        logger.error(f"Error processing frame for session {session.get('session_id', 'unknown')}: {e}")
+        frame_errors.inc()
+        logger.error(f"Error processing frame for session {session.session_id}: {e}")
         await sio.emit('feedback', {
             'emotion': 'Error',
             'posture': 'Error',
             'feedback': ['Error processing frame. Please try again.'],
             'emotion_trend': {},
+            'seq': seq,
+            'client_ts': client_ts,
             'session_active': True
         }, to=sid)
 
-# --- Cleanup Inactive Sessions ---
+# --- Shared Session State ---
+def session_info(session):
+    return {**session.info(), 'worker': NODE_ID}
+
+async def share_sessions(items):
+    # Best effort: a Redis hiccup must not break the session itself
+    try:
+        await state_backend.publish({sid: session_info(session) for sid, session in items.items()}, SESSION_PUBLISH_SECONDS * 3)
+    except Exception as e:
+        logger.warning(f"Could not publish session state: {e}")
+
+async def unshare_session(sid):
+    try:
+        await state_backend.remove(sid)
+    except Exception as e:
+        logger.warning(f"Could not remove shared state for {sid}: {e}")
+
+async def share_summary(session_id, summary):
+    try:
+        await state_backend.save_summary(session_id, summary)
+    except Exception as e:
+        logger.warning(f"Could not share summary for {session_id}: {e}")
+
+async def publish_sessions():
+    # Refresh this worker's sessions before their shared entries expire
+    while True:
+        await asyncio.sleep(SESSION_PUBLISH_SECONDS)
+        await share_sessions(dict(sessions.items()))
+
+# --- Metrics ---
+def live_sessions():
+    return [session for session in sessions.values() if session.session_active and session.frame_queue is not None]
+
+def session_frame_rates():
+    now = datetime.now()
+    rates = {}
+    for session in live_sessions():
+        elapsed = (now - session.start_time).total_seconds()
+        rates[(('session_id', session.session_id),)] = round(session.feedback_count / elapsed, 3) if elapsed > 0 else 0
+    return rates
+
+def cache_hit_rate():
+    hits = misses = 0
+    for session in live_sessions():
+        hits += session.result_cache.hits
+        misses += session.result_cache.misses
+    return round(hits / (hits + misses), 4) if hits + misses else 0
+
+metrics.gauge("active_sessions", "Connected clients with a session record", lambda: len(sessions))
+metrics.gauge("frame_queue_depth", "Live frames waiting for analysis, all sessions", lambda: sum(len(s.frame_queue) for s in live_sessions()))
+metrics.gauge("inference_in_flight", "Calls running or waiting on the inference pool", lambda: inference_pool.in_flight)
+metrics.gauge("job_segments_in_flight", "Upload segments running on the job pool", lambda: job_pool.in_flight)
+metrics.gauge("log_queue_depth", "Feedback log rows waiting to be written", lambda: get_log_writer(log_file).pending())
+metrics.gauge("log_rows_dropped", "Feedback log rows dropped because the queue was full", lambda: get_log_writer(log_file).dropped)
+metrics.gauge("result_cache_hit_ratio", "Share of live frames answered from the near-duplicate cache", cache_hit_rate)
+metrics.gauge("session_frame_rate", "Analysed frames per second, per live session", session_frame_rates)
+
+# --- Startup / Shutdown ---
 @app.on_event("startup")
 async def start_cleanup():
-    asyncio.create_task(cleanup_inactive_sessions(active_sessions, session_lock))
+    asyncio.create_task(cleanup_inactive_sessions(sessions, on_expired=unshare_session))
+    if state_backend.shared:
+        asyncio.create_task(publish_sessions())
+
+@app.on_event("startup")
+async def start_inference_pool():
+    inference_pool.start()
+    job_pool.start()
+    if PRELOAD_MODELS:
+        asyncio.create_task(warm_up_models())
+
+async def warm_up_models():
+    # Runs in the background so the server starts accepting health checks right away; /ready flips when done
+    started = time.monotonic()
+    try:
+        readiness['workers_warm'], _ = await asyncio.gather(inference_pool.warm_up(), job_pool.warm_up())
+        readiness['warm_up_seconds'] = round(time.monotonic() - started, 2)
+        readiness['ready'] = True
+        logger.info(f"Models warmed up in {readiness['warm_up_seconds']}s ({readiness['workers_warm']} workers)")
+    except Exception as e:
+        readiness['error'] = str(e)
+        logger.error(f"Model warm-up failed: {e}")
+
+@app.on_event("shutdown")
+async def stop_inference_pool():
+    inference_pool.shutdown()
+    job_pool.shutdown()
+
+@app.on_event("shutdown")
+async def flush_logs():
+    await asyncio.to_thread(close_log_writers)
+    await asyncio.to_thread(close_analytics_store)
+
+@app.on_event("shutdown")
+async def close_state_backend():
+    for sid, _ in sessions.items():
+        await unshare_session(sid)
+    await state_backend.close()
 
 # --- Routes ---
 @app.get("/")
@@ -175,104 +387,140 @@ async def serve_start_page():
 async def health_check():
     return {
         "status": "healthy",
-        "active_sessions": len(active_sessions),
+        "active_sessions": len(sessions),
         "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     }
 
+@app.get("/ready")
+async def ready_check():
+    # Separate from /health: healthy means the process is up, ready means models are loaded and warm
+    status_code = 200 if readiness['ready'] else 503
+    return JSONResponse(status_code=status_code, content={
+        "status": "ready" if readiness['ready'] else "warming_up",
+        **readiness
+    })
+
+@app.get("/metrics")
+async def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/sessions")
 async def get_active_sessions():
-    session_info = {}
-    async with session_lock:
-        for sid, session in active_sessions.items():
-            session_info[sid] = {
-                'session_active': session['session_active'],
-                'session_id': session['session_id'],
-                'start_time': session['start_time'].strftime("%Y-%m-%d %H:%M:%S") if session['start_time'] else None,
-                'feedback_count': session['feedback_count'],
-                'emotion_count': len(session['emotion_history']),
-                'posture_count': len(session['posture_history'])
-            }
-    return session_info
+    # Sessions on other workers come from the shared backend; this worker's own are listed fresh.
+    # Snapshot first; serialising happens without holding any lock
+    listed = await state_backend.list_sessions()
+    listed.update({sid: session_info(session) for sid, session in sessions.items()})
+    return listed
+
+@app.get("/sessions/{session_id}/summary")
+async def get_session_summary(session_id: str):
+    # Works whichever worker ended the session; older ones come from the analytics store
+    summary = await state_backend.get_summary(session_id) or await analytics.get_summary(session_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Unknown session or summary expired.")
+    return summary
+
+@app.get("/sessions/{session_id}/frames")
+async def get_session_frames(session_id: str, limit: int = Query(1000, gt=0, le=10000), offset: int = Query(0, ge=0)):
+    return await analytics.frames(session_id, limit, offset)
+
+# --- Reporting ---
+def summary_filters(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    dominant_emotion: Optional[str] = None,
+    dominant_posture: Optional[str] = None,
+    min_duration: Optional[float] = Query(None, ge=0, description="seconds"),
+    max_duration: Optional[float] = Query(None, ge=0, description="seconds"),
+    source: Optional[str] = Query(None, pattern="^(live|upload|batch)$"),
+):
+    return dict(start=start, end=end, dominant_emotion=dominant_emotion, dominant_posture=dominant_posture,
+                min_duration=min_duration, max_duration=max_duration, source=source)
+
+@app.get("/summaries")
+async def list_summaries(filters: dict = Depends(summary_filters), limit: int = Query(100, gt=0, le=1000), offset: int = Query(0, ge=0)):
+    return await analytics.find_summaries(limit, offset, **filters)
+
+@app.get("/summaries/aggregate")
+async def aggregate_summaries(filters: dict = Depends(summary_filters)):
+    return await analytics.aggregate(**filters)
 
 @app.post("/upload-video")
-async def upload_video(file: UploadFile = File(...)):
+async def upload_video(file: UploadFile = File(...), sample_seconds: float = Query(VIDEO_SAMPLE_SECONDS, gt=0)):
     if not file.content_type.startswith("video/"):
         raise HTTPException(status_code=400, detail="Invalid file type. Please upload a video.")
 
     session_id = get_session_id()
     video_path = os.path.join(UPLOAD_DIR, f"{session_id}_{file.filename}")
 
-    session = get_session_template()
-    session["session_id"] = session_id
-    session["session_active"] = True
-    session["start_time"] = datetime.now()
-    session['emotion_history'] = []
-    session['posture_history'] = []
-
     try:
-        with open(video_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        cap = cv2.VideoCapture(video_path)
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        if fps == 0:
-            raise ValueError("Could not get video FPS.")
-
-        frame_interval = int(fps * 5)
-        frame_count = 0
-
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            if frame_count % frame_interval == 0:
-                try:
-                    emotion, lighting_feedback, center_feedback = classify_emotion(frame)
-                    if emotion != "Unknown":
-                        session['emotion_history'].append(emotion)
-
-                    posture = "Unknown"
-                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    pose_results = get_pose_results(frame_rgb)
-                    if pose_results.pose_landmarks:
-                        posture = classify_posture(pose_results)
-                        session['posture_history'].append(posture)
-
-                    feedback = get_feedback(emotion, posture)
-                    if lighting_feedback:
-                        feedback.append(lighting_feedback)
-                    if center_feedback:
-                        feedback.append(center_feedback)
-
-                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    await log_to_csv([session_id, timestamp, emotion, posture, "; ".join(feedback)], log_file)
-
-                except Exception as e:
-                    logger.error(f"[Frame {frame_count}] Error: {e}")
-
-            frame_count += 1
-
-        cap.release()
-        session['session_active'] = False
-        end_time = datetime.now()
-        summary = generate_session_summary(session, end_time)
-
-        # Normalize summary keys to match frontend
-        summary['most_common_emotion'] = summary.pop('dominant_emotion', 'N/A')
-        summary['most_common_posture'] = summary.pop('dominant_posture', 'N/A')
-
-        save_session_summary(session_id, summary)
-
-        return JSONResponse(content={
-            "message": "Video uploaded and processed successfully!",
-            "session_id": session_id,
-            "summary": summary
-        })
-
+        await save_upload(file, video_path)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
+    job = job_manager.submit(session_id, video_path, sample_seconds, on_done=finish_upload_job)
+    return JSONResponse(status_code=202, content={
+        "message": "Video uploaded, analysis started.",
+        "job_id": job.job_id,
+        "session_id": session_id,
+        "status_url": f"/jobs/{job.job_id}",
+        "events_url": f"/jobs/{job.job_id}/events",
+        "cancel_url": f"/jobs/{job.job_id}/cancel"
+    })
+
+async def finish_upload_job(job):
+    # Merge the per-segment histories in video order into one session summary
+    session = job.new_session()
+    for _, emotion, posture, feedback in replay_records(job.records(), session.stats):
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        row = [job.session_id, timestamp, emotion, posture, "; ".join(feedback)]
+        await log_to_csv(row, log_file)
+        analytics.add_frame(row)
+
+    summary = generate_session_summary(session, datetime.now())
+    await analytics.save_summary(summary, source="upload")
+    summary = normalize_summary(summary)
+    await share_summary(job.session_id, summary)
+    return summary
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job.")
+    return job.to_dict()
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """
+    Server-sent events while the job runs: a 'frame' per sampled frame, 'progress' with the
+    running partial summary after each segment, then 'done', 'cancelled' or 'failed'.
+    Reconnecting browsers resume after Last-Event-ID.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job.")
+    last_id = request.headers.get("last-event-id", "")
+    start = int(last_id) + 1 if last_id.isdigit() else 0
+
+    async def events():
+        async for index, event, data in job.stream(start):
+            if index is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"id: {index}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job.")
+    if job.task is not None:
+        await asyncio.wait({job.task}, timeout=1.0)   # usually settles within a loop turn or two
+    return job.to_dict()
+
 
 
 # --- Entry Point ---
@@ -18,6 +18,11 @@ const fullscreenBtn = document.getElementById('fullscreenBtn');
 
 let analysisActive = false;
 let frameInterval;
+let frameSeq = 0;
+
+// Capture settings; the server sends its own in "session_config"
+let captureConfig = { width: 640, height: 480, interval_ms: 500, jpeg_quality: 0.8 };
+let binaryFrames = false;
 
 // Request webcam access
 navigator.mediaDevices.getUserMedia({ video: true }).then(stream => {
@@ -32,21 +37,44 @@ function startFrameCapture() {
   const canvas = document.createElement("canvas");
   const context = canvas.getContext("2d");
 
-  frameInterval = setInterval(() => {
+  // A timeout chain rather than setInterval, so each tick picks up the server's latest target
+  const scheduleNext = () => {
+    frameInterval = setTimeout(captureFrame, captureConfig.interval_ms);
+  };
+
+  const captureFrame = () => {
     if (!analysisActive) return;
+    scheduleNext();
 
-    canvas.width = video.videoWidth;
-    canvas.height = video.videoHeight;
+    // Capture at the negotiated resolution, not the full camera resolution
+    canvas.width = captureConfig.width;
+    canvas.height = captureConfig.height;
     context.drawImage(video, 0, 0, canvas.width, canvas.height);
-    const base64 = canvas.toDataURL("image/jpeg");
-    socket.emit("frame", { image: base64 });
-  }, 500); // Send frame every 500ms
+
+    const seq = ++frameSeq;
+    const ts = Date.now();
+    if (!binaryFrames) {
+      // Older servers only understand base64 data-URLs
+      socket.emit("frame", { image: canvas.toDataURL("image/jpeg"), seq, ts });
+      return;
+    }
+
+    // Raw JPEG bytes go out as a socket.io binary attachment
+    canvas.toBlob(blob => {
+      if (!blob || !analysisActive) return;
+      blob.arrayBuffer().then(buffer => {
+        socket.emit("frame", { image: buffer, seq, ts });
+      });
+    }, "image/jpeg", captureConfig.jpeg_quality);
+  };
+
+  scheduleNext();
 }
 
 // Function to stop capturing video frames
 function stopFrameCapture() {
   if (frameInterval) {
-    clearInterval(frameInterval);
+    clearTimeout(frameInterval);
     frameInterval = null;
   }
 }
@@ -185,6 +213,11 @@ socket.on("feedback", (data) => {
 
   const { emotion, posture, feedback } = data;
 
+  // The server adapts interval and resolution to its load
+  if (data.capture) {
+    captureConfig = { ...captureConfig, ...data.capture };
+  }
+
   emotionSpan.textContent = `${emotion} ${getEmojiForEmotion(emotion)}`;
   postureSpan.textContent = `${posture} ${getEmojiForPosture(posture)}`;
   adviceList.innerHTML = "";
@@ -221,6 +254,11 @@ setInterval(() => {
   emotionChart.update();
 }, 5000);
 
+socket.on("session_config", (config) => {
+  binaryFrames = !!config.binary_frames;
+  captureConfig = { ...captureConfig, ...config.capture };
+});
+
 socket.on("connect", () => {
   console.log("Connected to backend");
 });
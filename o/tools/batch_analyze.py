@@ -0,0 +1,228 @@
+#analyse a backlog of recorded interviews without the web server
+#
+#   cd o
+#   python -m tools.batch_analyze recordings/                      # every video under the directory
+#   python -m tools.batch_analyze --manifest overnight.txt         # one path per line
+#   python -m tools.batch_analyze recordings/ --stub-models        # offline dry run, no weights
+#
+# Same pipeline as /upload-video (analyze_segment -> replay_records -> generate_session_summary),
+# spread over a process pool with the models preloaded in every worker. Summaries and frame
+# records go to the analytics store in bulk. Finished videos are recorded by content hash in the
+# checkpoint file, so an interrupted run picks up where it stopped and renamed copies are skipped.
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+
+from utils.config_utils import ANALYTICS_DB_PATH, JOB_SEGMENT_SECONDS, VIDEO_SAMPLE_SECONDS
+from utils.inference_utils import analyze_segment, init_worker
+from utils.job_utils import get_video_duration, split_segments, replay_records
+from utils.session_utils import Session
+from utils.store_utils import AnalyticsStore, TIME_FORMAT
+from utils.summary_utils import generate_session_summary
+
+VIDEO_EXTENSIONS = {".mp4", ".mov", ".avi", ".mkv", ".webm", ".m4v"}
+
+# --- Inputs ---
+def collect_videos(paths, manifest=None):
+    videos = []
+    if manifest:
+        with open(manifest, encoding="utf-8") as f:
+            videos.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                videos.extend(os.path.join(root, name) for name in sorted(files)
+                              if os.path.splitext(name)[1].lower() in VIDEO_EXTENSIONS)
+        else:
+            videos.append(path)
+    return list(dict.fromkeys(videos))   # drop repeats, keep order
+
+def content_hash(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def probe_video(path):
+    # Runs on the I/O threads: hashing reads the whole file, so it overlaps with the analysis
+    return content_hash(path), get_video_duration(path)
+
+# --- Checkpoint ---
+def load_checkpoint(path):
+    done = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue   # a line cut short by a crash
+                done[entry['content_hash']] = entry
+    return done
+
+class VideoTask:
+    def __init__(self, path, digest, segments):
+        self.path = path
+        self.digest = digest
+        self.segments = segments
+        self.results = {}
+        self.pending = len(segments)
+        self.started = datetime.now()
+        self.failed = None
+
+    @property
+    def session_id(self):
+        # Keyed by content, so re-running a video replaces its summary instead of adding another
+        return f"batch_{self.digest[:16]}"
+
+    def finish(self):
+        """Summary + frame rows, replayed in video order exactly as an upload would be."""
+        session = Session(self.session_id, self.started)
+        records = [record for i in sorted(self.results) for record in self.results[i]]
+        frames = [
+            (self.session_id, (self.started + timedelta(seconds=record['seconds'])).strftime(TIME_FORMAT),
+             emotion, posture, "; ".join(feedback))
+            for record, emotion, posture, feedback in replay_records(records, session.stats)
+        ]
+        summary = generate_session_summary(session, datetime.now())
+        summary.update(video=self.path, content_hash=self.digest, frames_sampled=len(records))
+        return summary, frames
+
+# --- Run ---
+class BatchRun:
+    def __init__(self, args):
+        self.args = args
+        self.store = AnalyticsStore(args.db)
+        self.done = load_checkpoint(args.checkpoint)
+        self.summaries, self.frames, self.entries = [], [], []
+        self.counts = {'analysed': 0, 'skipped': 0, 'failed': 0, 'frames': 0}
+        self.started = time.monotonic()
+
+    def fps(self):
+        return self.counts['frames'] / max(time.monotonic() - self.started, 1e-9)
+
+    def flush(self):
+        # Database first, checkpoint second: a crash in between only means re-analysing, never losing
+        if not self.entries:
+            return
+        self.store.write_batch(self.summaries, self.frames, source="batch", replace_frames=True)
+        with open(self.args.checkpoint, "a", encoding="utf-8") as f:
+            for entry in self.entries:
+                f.write(json.dumps(entry) + "\n")
+        self.summaries, self.frames, self.entries = [], [], []
+
+    def complete(self, task):
+        summary, frames = task.finish()
+        self.summaries.append(summary)
+        self.frames.extend(frames)
+        self.entries.append({'content_hash': task.digest, 'path': task.path, 'session_id': task.session_id,
+                             'frames': len(frames), 'finished': summary['end_time']})
+        self.done[task.digest] = self.entries[-1]
+        self.counts['analysed'] += 1
+        self.counts['frames'] += len(frames)
+        print(f"[done] {task.path}: {len(frames)} frames, {summary['dominant_emotion']}/{summary['dominant_posture']} "
+              f"({self.fps():.1f} frames/s overall)")
+        if len(self.entries) >= self.args.flush_every:
+            self.flush()
+
+    def fail(self, path, error):
+        self.counts['failed'] += 1
+        print(f"[failed] {path}: {error}", file=sys.stderr)
+
+    def run(self, videos):
+        args = self.args
+        probes = deque()
+        tasks = {}      # digest -> VideoTask still running
+        running = {}    # future -> (task, segment index)
+        with ThreadPoolExecutor(args.io_threads, thread_name_prefix="probe") as io, ProcessPoolExecutor(
+            max_workers=args.workers, mp_context=multiprocessing.get_context("spawn"), initializer=init_worker
+        ) as pool:
+            probes.extend((path, io.submit(probe_video, path)) for path in videos)
+            try:
+                while probes or running:
+                    # Keep a couple of videos per worker queued; more would only hold results in memory
+                    while probes and len(tasks) < args.workers * 2:
+                        path, probe = probes.popleft()
+                        try:
+                            digest, duration = probe.result()
+                        except Exception as e:
+                            self.fail(path, e)
+                            continue
+                        if digest in self.done or digest in tasks:
+                            self.counts['skipped'] += 1
+                            print(f"[skip] {path}: already analysed")
+                            continue
+                        task = VideoTask(path, digest, split_segments(duration, args.sample_seconds, args.segment_seconds))
+                        tasks[digest] = task
+                        for index, (start, end) in enumerate(task.segments):
+                            future = pool.submit(analyze_segment, path, start, end, args.sample_seconds)
+                            running[future] = (task, index)
+
+                    if not running:
+                        continue
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        task, index = running.pop(future)
+                        try:
+                            task.results[index] = future.result()
+                        except Exception as e:
+                            task.failed = task.failed or e
+                        task.pending -= 1
+                        if task.pending:
+                            continue
+                        del tasks[task.digest]
+                        if task.failed:
+                            self.fail(task.path, task.failed)
+                        else:
+                            self.complete(task)
+            except KeyboardInterrupt:
+                print("Interrupted; saving finished videos. Run again to resume.", file=sys.stderr)
+                pool.shutdown(wait=False, cancel_futures=True)
+                io.shutdown(wait=False, cancel_futures=True)
+            finally:
+                self.flush()
+        self.store.close()
+        return self.counts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse recorded interviews in bulk, without the web server.")
+    parser.add_argument("paths", nargs="*", help="video files or directories")
+    parser.add_argument("--manifest", help="text file with one video path per line")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--io-threads", type=int, default=4, help="threads hashing and probing videos ahead of the pool")
+    parser.add_argument("--sample-seconds", type=float, default=VIDEO_SAMPLE_SECONDS)
+    parser.add_argument("--segment-seconds", type=float, default=JOB_SEGMENT_SECONDS)
+    parser.add_argument("--db", default=ANALYTICS_DB_PATH, help="analytics store to write summaries to")
+    parser.add_argument("--checkpoint", default="batch_checkpoint.jsonl")
+    parser.add_argument("--flush-every", type=int, default=50, help="videos per bulk write")
+    parser.add_argument("--stub-models", action="store_true", help="use stand-in emotion/pose models (offline, no weights)")
+    args = parser.parse_args(argv)
+
+    if args.stub_models:
+        # Workers are spawned, so the backends are chosen through their environment
+        os.environ["EMOTION_BACKEND"] = "stub"
+        os.environ["POSE_BACKEND"] = "stub"
+
+    videos = collect_videos(args.paths, args.manifest)
+    if not videos:
+        parser.error("no videos found")
+    print(f"{len(videos)} videos, {args.workers} workers")
+
+    batch = BatchRun(args)
+    counts = batch.run(videos)
+    elapsed = time.monotonic() - batch.started
+    print(f"Analysed {counts['analysed']}, skipped {counts['skipped']}, failed {counts['failed']} "
+          f"in {elapsed:.1f}s: {counts['frames']} frames, {counts['frames'] / max(elapsed, 1e-9):.1f} frames/s")
+    return 1 if counts['failed'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+#export the DeepFace emotion model to ONNX (and an int8 copy) for the onnx/opencv backends
+#
+#   cd o
+#   python -m tools.export_emotion_model                 # models/emotion.onnx + models/emotion.int8.onnx
+#   python -m tools.export_emotion_model --nchw          # channels-first, needed by EMOTION_BACKEND=opencv
+#
+# Needs tensorflow/deepface, tf2onnx and onnxruntime; only the export machine needs them.
+
+import argparse
+import os
+import sys
+
+from utils.backend_utils import DeepFaceBackend
+from utils.config_utils import EMOTION_MODEL_PATH, EMOTION_MODEL_INT8_PATH, EMOTION_MODEL_INPUT_SIZE
+
+def export(output, nchw=False):
+    import tensorflow as tf
+    import tf2onnx
+
+    model = DeepFaceBackend().model
+    size = EMOTION_MODEL_INPUT_SIZE
+    spec = (tf.TensorSpec((None, size, size, 1), tf.float32, name="face"),)
+    extra = {'inputs_as_nchw': ["face"]} if nchw else {}
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    tf2onnx.convert.from_keras(model, input_signature=spec, opset=13, output_path=output, **extra)
+
+def quantize(source, output):
+    # Weights to int8; activations are quantised on the fly, so no calibration set is needed
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    quantize_dynamic(source, output, weight_type=QuantType.QInt8, op_types_to_quantize=["Conv", "MatMul", "Gemm"])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the emotion model to ONNX.")
+    parser.add_argument("--output", default=EMOTION_MODEL_PATH)
+    parser.add_argument("--int8-output", default=EMOTION_MODEL_INT8_PATH)
+    parser.add_argument("--nchw", action="store_true", help="channels-first input (cv2.dnn)")
+    parser.add_argument("--skip-int8", action="store_true")
+    args = parser.parse_args(argv)
+
+    export(args.output, args.nchw)
+    print(f"Wrote {args.output}")
+    if not args.skip_int8:
+        quantize(args.output, args.int8_output)
+        print(f"Wrote {args.int8_output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
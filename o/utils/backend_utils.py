@@ -0,0 +1,139 @@
+#emotion inference backends: same interface, selected with EMOTION_BACKEND
+
+from collections import Counter
+
+import cv2
+import numpy as np
+
+from utils.config_utils import (
+    EMOTION_BACKEND, EMOTION_MODEL_PATH, EMOTION_MODEL_INT8_PATH, EMOTION_MODEL_QUANTIZED,
+    EMOTION_MODEL_INPUT_SIZE, EMOTION_MODEL_THREADS
+)
+
+EMOTION_LABELS = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']  # DeepFace output order
+
+class EmotionBackend:
+    """
+    Classifies already-cropped faces. predict() takes 224x224 BGR crops and returns one
+    (dominant_emotion, confidence) pair per face, confidence in percent like DeepFace.analyze.
+    """
+
+    name = "base"
+    labels = EMOTION_LABELS
+    input_size = 48
+
+    def predict(self, faces):
+        if not faces:
+            return []
+        return self.to_results(self.run(self.to_gray_batch(faces)))
+
+    def run(self, batch):
+        raise NotImplementedError
+
+    def to_gray_batch(self, faces):
+        # NHWC float batch in [0, 1], the layout the DeepFace model was trained on
+        size = self.input_size
+        batch = np.empty((len(faces), size, size, 1), dtype=np.float32)
+        for i, face in enumerate(faces):
+            gray = cv2.cvtColor(face, cv2.COLOR_BGR2GRAY)
+            batch[i, :, :, 0] = cv2.resize(gray, (size, size))
+        batch /= 255.0
+        return batch
+
+    def to_results(self, predictions):
+        predictions = np.asarray(predictions, dtype=np.float32)
+        if predictions.min() < 0 or predictions.max() > 1:   # logits, not probabilities
+            predictions = np.exp(predictions - predictions.max(axis=1, keepdims=True))
+        results = []
+        for scores in predictions:
+            scores = 100 * scores / scores.sum()
+            best = int(np.argmax(scores))
+            results.append((self.labels[best], float(scores[best])))
+        return results
+
+class DeepFaceBackend(EmotionBackend):
+    """The DeepFace Keras model, called directly on the crop (no second face detection)."""
+
+    name = "deepface"
+
+    def __init__(self):
+        from deepface import DeepFace   # pulls in TensorFlow, so only on first use
+        try:
+            model = DeepFace.build_model(model_name="Emotion", task="facial_attribute")
+        except TypeError:  # older deepface: build_model(model_name)
+            model = DeepFace.build_model("Emotion")
+        self.model = getattr(model, 'model', model)  # newer deepface wraps the keras model in a client object
+
+    def run(self, batch):
+        return self.model.predict(batch, verbose=0)
+
+class OnnxBackend(EmotionBackend):
+    """An exported emotion model on ONNX Runtime (CPU), optionally int8-quantised."""
+
+    name = "onnx"
+
+    def __init__(self, path=None, quantized=EMOTION_MODEL_QUANTIZED, input_size=EMOTION_MODEL_INPUT_SIZE, threads=EMOTION_MODEL_THREADS):
+        import onnxruntime as ort
+        self.path = path or (EMOTION_MODEL_INT8_PATH if quantized else EMOTION_MODEL_PATH)
+        self.input_size = input_size
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(self.path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        self.channels_first = self.session.get_inputs()[0].shape[1] == 1
+
+    def run(self, batch):
+        if self.channels_first:
+            batch = batch.transpose(0, 3, 1, 2)
+        return self.session.run(None, {self.input_name: batch})[0]
+
+class OpenCVDnnBackend(EmotionBackend):
+    """The same exported model on cv2.dnn. Expects an NCHW export (tf2onnx --inputs-as-nchw)."""
+
+    name = "opencv"
+
+    def __init__(self, path=None, quantized=EMOTION_MODEL_QUANTIZED, input_size=EMOTION_MODEL_INPUT_SIZE, threads=EMOTION_MODEL_THREADS):
+        self.path = path or (EMOTION_MODEL_INT8_PATH if quantized else EMOTION_MODEL_PATH)
+        self.input_size = input_size
+        cv2.setNumThreads(threads)
+        self.net = cv2.dnn.readNetFromONNX(self.path)
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+
+    def run(self, batch):
+        self.net.setInput(batch.transpose(0, 3, 1, 2))
+        return self.net.forward()
+
+def build_emotion_backend(name=EMOTION_BACKEND):
+    if name == "deepface":
+        return DeepFaceBackend()
+    if name == "onnx":
+        return OnnxBackend()
+    if name == "opencv":
+        return OpenCVDnnBackend()
+    if name == "stub":
+        from utils.stub_models import StubEmotionBackend
+        return StubEmotionBackend()
+    raise ValueError(f"Unknown emotion backend: {name!r}")
+
+def compare_backends(reference, candidate, faces, batch_size=16):
+    """
+    Label parity between two backends on the same face crops.
+    Returns the agreement rate and the most common (reference, candidate) disagreements.
+    """
+    confusions = Counter()
+    agree = 0
+    for start in range(0, len(faces), batch_size):
+        chunk = faces[start:start + batch_size]
+        for (expected, _), (actual, _) in zip(reference.predict(chunk), candidate.predict(chunk)):
+            if expected == actual:
+                agree += 1
+            else:
+                confusions[(expected, actual)] += 1
+    return {
+        'faces': len(faces),
+        'agreement': round(agree / len(faces), 4) if faces else None,
+        'disagreements': [{'reference': a, 'candidate': b, 'count': n} for (a, b), n in confusions.most_common(10)],
+    }
@@ -0,0 +1,92 @@
+#cross-session micro-batching for emotion inference
+
+import asyncio
+import logging
+import time
+
+from utils.config_utils import EMOTION_BATCH_SIZE, EMOTION_BATCH_WAIT_MS
+from utils.emotion_utils import predict_emotions, interpret_emotion
+from utils.metrics_utils import stage_seconds, emotion_batch_size
+
+logger = logging.getLogger("interview_analyzer")
+
+class EmotionBatcher:
+    """
+    Collects face crops from every caller (live sessions and uploads) and runs one
+    forward pass per batch on the inference pool. Each caller awaits its own result.
+    """
+
+    def __init__(self, pool, max_batch=EMOTION_BATCH_SIZE, max_wait_ms=EMOTION_BATCH_WAIT_MS):
+        self.pool = pool
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000
+        self._pending = []      # (face, future)
+        self._timer = None
+        self._running = set()   # keep references to in-flight batch tasks
+
+    async def submit(self, face):
+        """Queue one 224x224 face crop; returns (dominant_emotion, confidence)."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((face, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._run_batch(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run_batch(self, batch):
+        faces = [face for face, _ in batch]
+        emotion_batch_size.observe(len(faces))
+        started = time.perf_counter()
+        try:
+            results = await self.pool.run(predict_emotions, faces)
+            stage_seconds.observe(time.perf_counter() - started, stage="emotion")
+        except Exception as e:
+            logger.error(f"Emotion batch of {len(batch)} failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():   # caller may have been cancelled meanwhile
+                future.set_result(result)
+
+async def predict_face(batcher, analysis):
+    """Add the batched (dominant_emotion, confidence) for an analyze_frame() result as 'prediction'."""
+    analysis['prediction'] = None
+    if analysis['face'] is not None:
+        try:
+            analysis['prediction'] = await batcher.submit(analysis['face'])
+        except Exception:
+            pass
+    return analysis
+
+def finalize_emotion(analysis, stats=None):
+    """Final emotion label for a predicted analysis. Kept separate so smoothing can run in frame order."""
+    if analysis['emotion'] is not None:   # no single face: the reason is the label
+        return analysis['emotion']
+    if analysis['prediction'] is None:
+        return "Unknown"
+    dominant_emotion, confidence = analysis['prediction']
+    return interpret_emotion(dominant_emotion, confidence, stats=stats)
+
+async def resolve_emotion(batcher, analysis, stats=None):
+    """Turn an analyze_frame() result into the final emotion label, batching the model call."""
+    await predict_face(batcher, analysis)
+    return finalize_emotion(analysis, stats)
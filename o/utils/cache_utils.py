@@ -0,0 +1,49 @@
+#skip inference on near-duplicate frames: thumbnail signature + per-session result cache
+
+import time
+
+import cv2
+import numpy as np
+
+from utils.config_utils import RESULT_CACHE_TOLERANCE, RESULT_CACHE_MAX_AGE
+
+SIGNATURE_SIZE = (32, 24)
+
+def frame_signature(frame):
+    # Downscale first so the colour conversion only touches 768 pixels
+    thumb = cv2.resize(frame, SIGNATURE_SIZE, interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(thumb, cv2.COLOR_BGR2GRAY)
+
+def frame_unchanged(signature, reference, tolerance=RESULT_CACHE_TOLERANCE):
+    return float(np.mean(cv2.absdiff(signature, reference))) <= tolerance
+
+class FrameResultCache:
+    """
+    The last analysed frame's signature and result for one session. The signature is
+    compared in the worker; the result itself never leaves the main process.
+    """
+
+    def __init__(self, tolerance=RESULT_CACHE_TOLERANCE, max_age=RESULT_CACHE_MAX_AGE):
+        self.tolerance = tolerance
+        self.max_age = max_age
+        self.reference = None
+        self.result = None
+        self.stored = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def lookup_reference(self):
+        """Signature to compare the next frame against, or None when the result is too old to reuse."""
+        if self.result is None or time.monotonic() - self.stored > self.max_age:
+            return None
+        return self.reference
+
+    def hit(self):
+        self.hits += 1
+        return self.result
+
+    def store(self, signature, result):
+        self.misses += 1
+        self.reference = signature
+        self.result = result
+        self.stored = time.monotonic()
@@ -1,17 +1,14 @@
 import asyncio
-from datetime import datetime
 import logging
 
 logger = logging.getLogger("interview_analyzer")
 
-async def cleanup_inactive_sessions(active_sessions, session_lock, timeout_seconds=300):
+async def cleanup_inactive_sessions(session_store, on_expired=None, max_sleep_seconds=60):
     while True:
-        now = datetime.now()
-        async with session_lock:
-            for sid, session in list(active_sessions.items()):
-                if session['start_time'] and not session['session_active']:
-                    elapsed = (now - session['start_time']).total_seconds()
-                    if elapsed > timeout_seconds:
-                        del active_sessions[sid]
-                        logger.info(f"Cleaned up inactive session {sid}")
-        await asyncio.sleep(60)
+        for sid, session in session_store.pop_expired():
+            logger.info(f"Cleaned up inactive session {sid}")
+            if on_expired is not None:
+                await on_expired(sid)
+        # Wake up for the next due session rather than rescanning everything on a timer
+        wait = session_store.seconds_to_next_expiry()
+        await asyncio.sleep(max_sleep_seconds if wait is None else min(max(wait, 1.0), max_sleep_seconds))
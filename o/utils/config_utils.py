@@ -0,0 +1,91 @@
+#runtime settings, overridable with environment variables
+
+import os
+
+def env_int(name, default):
+    return int(os.getenv(name, default))
+
+def env_float(name, default):
+    return float(os.getenv(name, default))
+
+# --- Inference Executor ---
+INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "process")   # "process" or "thread"
+INFERENCE_WORKERS = env_int("INFERENCE_WORKERS", os.cpu_count() or 1)
+FRAME_QUEUE_SIZE = env_int("FRAME_QUEUE_SIZE", 1)                # frames buffered per session, newest wins
+
+# --- Emotion Batching ---
+EMOTION_BATCH_SIZE = env_int("EMOTION_BATCH_SIZE", 16)           # flush when this many face crops are waiting
+EMOTION_BATCH_WAIT_MS = env_float("EMOTION_BATCH_WAIT_MS", 20)   # ...or when the oldest has waited this long
+
+# --- Face Tracking ---
+FACE_REDETECT_INTERVAL = env_int("FACE_REDETECT_INTERVAL", 15)      # frames between full-frame detections
+FACE_SEARCH_PADDING = env_float("FACE_SEARCH_PADDING", 0.5)         # search margin around the last box, in box sizes
+FACE_TRACK_MIN_SCORE = env_float("FACE_TRACK_MIN_SCORE", 0.6)       # template match score below which we re-detect
+FACE_DETECT_SCALE = env_float("FACE_DETECT_SCALE", 0.5)             # detection/tracking runs on the 640x480 gray image scaled by this
+
+# --- Frame Capture (negotiated with the browser on start_session) ---
+CAPTURE_WIDTH = env_int("CAPTURE_WIDTH", 640)        # preprocessing works at 640x480, no point sending more
+CAPTURE_HEIGHT = env_int("CAPTURE_HEIGHT", 480)
+CAPTURE_INTERVAL_MS = env_int("CAPTURE_INTERVAL_MS", 500)
+CAPTURE_JPEG_QUALITY = env_float("CAPTURE_JPEG_QUALITY", 0.8)
+
+# --- Video Uploads ---
+UPLOAD_CHUNK_SIZE = env_int("UPLOAD_CHUNK_SIZE", 1024 * 1024)
+VIDEO_SAMPLE_SECONDS = env_float("VIDEO_SAMPLE_SECONDS", 5.0)     # default gap between analysed frames
+VIDEO_SEEK_MIN_GAP = env_int("VIDEO_SEEK_MIN_GAP", 60)            # seek instead of grab() for gaps of this many frames
+
+# --- Background Jobs ---
+JOB_SEGMENT_SECONDS = env_float("JOB_SEGMENT_SECONDS", 60.0)     # length of the video slices analysed in parallel
+JOB_RETENTION_SECONDS = env_int("JOB_RETENTION_SECONDS", 3600)   # how long finished jobs stay queryable
+JOB_WORKERS = env_int("JOB_WORKERS", max(1, INFERENCE_WORKERS // 4))   # workers of their own, so live frames never queue behind a segment
+
+# --- Feedback Log ---
+LOG_MODE = os.getenv("LOG_MODE", "append")                    # "append": one shared file, "session": one file per session
+LOG_BATCH_SIZE = env_int("LOG_BATCH_SIZE", 200)               # rows written per flush at most
+LOG_FLUSH_INTERVAL = env_float("LOG_FLUSH_INTERVAL", 1.0)     # seconds between flushes when rows are waiting
+LOG_QUEUE_SIZE = env_int("LOG_QUEUE_SIZE", 10000)
+LOG_QUEUE_POLICY = os.getenv("LOG_QUEUE_POLICY", "drop")      # full queue: "drop" the row or "block" the caller
+LOG_MAX_BYTES = env_int("LOG_MAX_BYTES", 50 * 1024 * 1024)    # rotate the shared file past this size (0 = never)
+LOG_ROTATE_SECONDS = env_int("LOG_ROTATE_SECONDS", 0)         # ...or after this long (0 = never)
+
+# --- Sessions ---
+SESSION_STORE_SHARDS = env_int("SESSION_STORE_SHARDS", 16)        # lock shards in the session store
+SESSION_EXPIRY_SECONDS = env_int("SESSION_EXPIRY_SECONDS", 300)   # ended sessions stay listed this long
+REDIS_URL = os.getenv("REDIS_URL", "")                              # set to run several workers/nodes behind sticky routing
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "redis" if REDIS_URL else "memory")   # "memory" or "redis"
+SESSION_PUBLISH_SECONDS = env_float("SESSION_PUBLISH_SECONDS", 5.0)   # how often live session info is shared with other workers
+SUMMARY_TTL_SECONDS = env_int("SUMMARY_TTL_SECONDS", 86400)           # how long shared session summaries are kept
+
+# --- Analytics Store ---
+ANALYTICS_DB_PATH = os.getenv("ANALYTICS_DB_PATH", "analytics.db")   # SQLite (WAL) file for summaries and frame records
+ANALYTICS_BATCH_SIZE = env_int("ANALYTICS_BATCH_SIZE", 500)          # frame records per bulk insert at most
+
+# --- Result Cache ---
+RESULT_CACHE_TOLERANCE = env_float("RESULT_CACHE_TOLERANCE", 4.0)   # mean abs grey-level difference still "the same frame"
+RESULT_CACHE_MAX_AGE = env_float("RESULT_CACHE_MAX_AGE", 2.0)       # seconds before a cached result is recomputed anyway
+
+# --- Adaptive Frame Rate ---
+RATE_MIN_INTERVAL_MS = env_int("RATE_MIN_INTERVAL_MS", CAPTURE_INTERVAL_MS)   # only back off: frame-count windows (no-face auto-end, trends) assume this rate
+RATE_MAX_INTERVAL_MS = env_int("RATE_MAX_INTERVAL_MS", 2000)
+RATE_HEADROOM = env_float("RATE_HEADROOM", 1.5)     # capture interval vs. measured processing time
+
+# --- Metrics ---
+FRAME_LOG_SAMPLE_EVERY = env_int("FRAME_LOG_SAMPLE_EVERY", 100)   # INFO-log one in this many frames per session
+
+# --- Startup ---
+PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "1") == "1"    # load + warm up models in every worker at startup
+
+# --- Model Backends ---
+EMOTION_BACKEND = os.getenv("EMOTION_BACKEND", "deepface")      # "deepface", "onnx", "opencv" or "stub"
+EMOTION_MODEL_PATH = os.getenv("EMOTION_MODEL_PATH", "models/emotion.onnx")
+EMOTION_MODEL_INT8_PATH = os.getenv("EMOTION_MODEL_INT8_PATH", "models/emotion.int8.onnx")
+EMOTION_MODEL_QUANTIZED = os.getenv("EMOTION_MODEL_QUANTIZED", "0") == "1"   # use the int8 model
+EMOTION_MODEL_INPUT_SIZE = env_int("EMOTION_MODEL_INPUT_SIZE", 48)
+EMOTION_MODEL_THREADS = env_int("EMOTION_MODEL_THREADS", 1)      # per worker; the pool already uses every core
+POSE_BACKEND = os.getenv("POSE_BACKEND", "mediapipe")           # "mediapipe" or "stub"
+
+# --- Pose Estimation ---
+POSE_MODEL_COMPLEXITY = env_int("POSE_MODEL_COMPLEXITY", 0)     # MediaPipe 0 (lite), 1 (full) or 2 (heavy)
+POSE_EVERY_N_FRAMES = env_int("POSE_EVERY_N_FRAMES", 2)         # run pose on one in N live frames, carry landmarks in between
+POSE_INPUT_MAX_SIDE = env_int("POSE_INPUT_MAX_SIDE", 256)       # upper-body region is downscaled to this before pose
+POSE_MAX_SESSIONS = env_int("POSE_MAX_SESSIONS", 32)            # per-session estimators kept per worker (LRU)
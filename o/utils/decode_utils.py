@@ -1,12 +1,22 @@
-#for base64 frame decoding
+#frame decode: binary JPEG attachments, or base64 data-URLs from older clients
 
 import base64
 import numpy as np
 import cv2
 
-def decode_frame(base64_str):  # base64 image string -> opencv frame
-    header, encoded = base64_str.split(",", 1)
-    img_data = base64.b64decode(encoded)
-    np_arr = np.frombuffer(img_data, np.uint8)
+def decode_frame(data):  # JPEG bytes / base64 image string -> opencv frame
+    if isinstance(data, str):
+        header, encoded = data.split(",", 1)
+        data = base64.b64decode(encoded)
+    np_arr = np.frombuffer(data, np.uint8)  # wraps the buffer, no copy
     frame = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-    return frame
\ No newline at end of file
+    return frame
+
+def parse_frame_payload(data):
+    """
+    Split a 'frame' event payload into (image, seq, client_ts).
+    Accepts raw bytes, {'image': bytes, 'seq': n, 'ts': ms} or the legacy {'image': data-URL}.
+    """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return data, None, None
+    return data['image'], data.get('seq'), data.get('ts')
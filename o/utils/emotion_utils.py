@@ -1,12 +1,20 @@
-from deepface import DeepFace
 import cv2
 import numpy as np
-from collections import deque, Counter
 import logging
+import threading
+import time
+
+from utils.config_utils import FACE_DETECT_SCALE
+from utils.face_utils import DETECT_SIZE, detect_faces, scale_boxes
+from utils.model_utils import register_model, get_model
+from utils.backend_utils import build_emotion_backend
 
 # --- Setup ---
 logging.basicConfig(level=logging.INFO)
-emotion_window = deque(maxlen=10)
+
+def load_emotion_model():
+    # The backend (DeepFace by default, see EMOTION_BACKEND) is built once per worker
+    return get_model("emotion")
 
 # --- Preprocessing ---
 def preprocess_frame(frame):
@@ -18,76 +26,128 @@ def preprocess_frame(frame):
     frame = cv2.convertScaleAbs(frame)
     return frame
 
-# --- Emotion Classification ---
-def classify_emotion(frame, threshold=0.5):
+class FramePreprocessor:
     """
-    Detect emotion with smoothing, lighting feedback, and face centering check.
+    preprocess_frame() fused for the live path, into buffers reused frame after frame:
+    the equalised 640x480 gray image, a smaller copy for detection, and the brightness.
+    The colour face crop is made from the gray crop only, which gives the same pixels as
+    cropping preprocess_frame()'s gray-as-BGR frame.
+    """
+
+    def __init__(self, detect_size=DETECT_SIZE):
+        self.detect_size = detect_size
+        self.resized = np.empty((480, 640, 3), dtype=np.uint8)
+        self.gray = np.empty((480, 640), dtype=np.uint8)
+        self.equalized = np.empty((480, 640), dtype=np.uint8)
+        self.detect = np.empty(detect_size[::-1], dtype=np.uint8)
+
+    def run(self, frame):
+        """Returns (equalised gray, detection image, mean brightness). Valid until the next call."""
+        if frame.shape[:2] != (480, 640):
+            frame = cv2.resize(frame, (640, 480), dst=self.resized)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self.gray)
+        cv2.equalizeHist(self.gray, dst=self.equalized)
+        if self.detect_size == (640, 480):
+            detect = self.equalized
+        else:
+            detect = cv2.resize(self.equalized, self.detect_size, dst=self.detect, interpolation=cv2.INTER_AREA)
+        return self.equalized, detect, cv2.mean(self.equalized)[0]
+
+preprocessors = threading.local()   # one set of buffers per worker thread
+
+def get_preprocessor():
+    if not hasattr(preprocessors, "current"):
+        preprocessors.current = FramePreprocessor()
+    return preprocessors.current
+
+def face_crop(gray_frame, box, size=224):
+    # Resize the gray crop, then expand to 3 channels: only 224x224 gets converted
+    x, y, w, h = box
+    return cv2.cvtColor(cv2.resize(gray_frame[y:y+h, x:x+w], (size, size)), cv2.COLOR_GRAY2BGR)
+
+# --- Face Localisation ---
+def locate_face(frame, tracker=None, timings=None):
+    """
+    Find the face to analyse, plus lighting and centering feedback.
+    With a FaceTracker the face is followed from the previous frame instead of detected from scratch.
+    Stage durations are added to `timings` when given.
     Returns:
-        - Emotion label (string)
-        - Feedback string for lighting/centering (or None)
+        - 224x224 face crop (or None)
+        - Status label when there is no single face to analyse (or None)
+        - Lighting feedback (or None)
+        - Centering feedback (or None)
     """
     try:
-        frame = preprocess_frame(frame)
-        gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        started = time.perf_counter()
+        gray_frame, detect_frame, avg_brightness = get_preprocessor().run(frame)
 
         # Lighting check
-        avg_brightness = np.mean(gray_frame)
         lighting_feedback = "Lighting is too dark" if avg_brightness < 50 else None
+        detect_started = time.perf_counter()
 
-        # Face detection
-        face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-        faces = face_cascade.detectMultiScale(gray_frame, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30))
+        # Face detection, on the smaller image; boxes come back in 640x480 coordinates
+        faces = tracker.locate(detect_frame) if tracker is not None else detect_faces(detect_frame)
+        faces = scale_boxes(faces, 1 / FACE_DETECT_SCALE)
+        if timings is not None:
+            timings['preprocess'] = detect_started - started
+            timings['detect'] = time.perf_counter() - detect_started
 
         if len(faces) == 0:
-            return "No face detected", lighting_feedback, None
+            return None, "No face detected", lighting_feedback, None
         elif len(faces) > 1:
-            return "Multiple faces detected", lighting_feedback, None
+            return None, "Multiple faces detected", lighting_feedback, None
 
         # Use first face
         x, y, w, h = faces[0]
-        face_roi = frame[y:y+h, x:x+w]
 
         # Centering feedback
-        frame_center_x, frame_center_y = frame.shape[1] // 2, frame.shape[0] // 2
+        frame_center_x, frame_center_y = gray_frame.shape[1] // 2, gray_frame.shape[0] // 2
         face_center_x, face_center_y = x + w // 2, y + h // 2
-        center_feedback = "Face is not centered" if abs(face_center_x - frame_center_x) > frame.shape[1] * 0.2 else None
+        center_feedback = "Face is not centered" if abs(face_center_x - frame_center_x) > gray_frame.shape[1] * 0.2 else None
 
         #rectangle (for UI display)
         # cv2.rectangle(frame, (x, y), (x + w, y + h), (255, 0, 0), 2)
 
         # Resize face ROI for DeepFace
-        face_roi_resized = cv2.resize(face_roi, (224, 224))
-
-        # Emotion analysis
-        results = DeepFace.analyze(
-            face_roi_resized,
-            actions=['emotion'],
-            enforce_detection=False,
-            detector_backend='mediapipe',
-            silent=True
-        )
-
-        dominant_emotion = results[0]['dominant_emotion']
-        confidence = results[0]['emotion'][dominant_emotion]
+        return face_crop(gray_frame, (x, y, w, h)), None, lighting_feedback, center_feedback
 
-        # --- Emotion conversion logic ---
-        if dominant_emotion == 'fear':
-            dominant_emotion = 'neutral'
-        elif dominant_emotion == 'neutral':
-            dominant_emotion = 'calm'
-        # --- End of conversion logic ---
-
-        logging.info(f"Detected emotion: {dominant_emotion} (confidence: {confidence:.2f})")
+    except Exception as e:
+        logging.error(f"Face localisation failed: {str(e)}")
+        return None, "Unknown", None, None
 
-        if confidence < threshold:
-            return "Uncertain", lighting_feedback, center_feedback
+# --- Emotion Inference ---
+def predict_emotions(faces):
+    """
+    One forward pass of the configured emotion backend over a batch of face crops.
+    Returns a (dominant_emotion, confidence) pair per face, confidence in percent like DeepFace.analyze.
+    """
+    if not faces:
+        return []
+    return load_emotion_model().predict(faces)
 
-        # Smooth using rolling window
-        emotion_window.append(dominant_emotion)
-        most_common = Counter(emotion_window).most_common(1)
+def warm_up_emotion_model(backend):
+    backend.predict([np.zeros((224, 224, 3), dtype=np.uint8)])
 
-        return most_common[0][0] if most_common else "Unknown", lighting_feedback, center_feedback
+register_model("emotion", build_emotion_backend, warm_up=warm_up_emotion_model)
 
-    except Exception as e:
-        logging.error(f"Emotion classification failed: {str(e)}")
-        return "Unknown", None, None
\ No newline at end of file
+def interpret_emotion(dominant_emotion, confidence, threshold=0.5, stats=None):
+    """
+    Map a raw model prediction to the label shown to the user (conversion, threshold, smoothing).
+    Smoothing uses the caller's SessionStats, so sessions never see each other's emotions.
+    """
+    # --- Emotion conversion logic ---
+    if dominant_emotion == 'fear':
+        dominant_emotion = 'neutral'
+    elif dominant_emotion == 'neutral':
+        dominant_emotion = 'calm'
+    # --- End of conversion logic ---
+
+    logging.debug(f"Detected emotion: {dominant_emotion} (confidence: {confidence:.2f})")
+
+    if confidence < threshold:
+        return "Uncertain"
+
+    # Smooth using the session's rolling window
+    if stats is None:
+        return dominant_emotion
+    return stats.smooth(dominant_emotion) or "Unknown"
@@ -0,0 +1,102 @@
+#face localisation: cached cascade + per-session tracking between detections
+
+import cv2
+import numpy as np
+
+from utils.config_utils import FACE_REDETECT_INTERVAL, FACE_SEARCH_PADDING, FACE_TRACK_MIN_SCORE, FACE_DETECT_SCALE
+from utils.model_utils import register_model, get_model
+
+def build_face_cascade():
+    return cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+
+def get_face_cascade():
+    # Loaded once per worker instead of parsing the XML on every frame
+    return get_model("face_cascade")
+
+DETECT_SIZE = (round(640 * FACE_DETECT_SCALE), round(480 * FACE_DETECT_SCALE))   # (width, height) of the detection image
+MIN_FACE = max(8, round(30 * FACE_DETECT_SCALE))   # 30px at 640x480, as before
+
+def detect_faces(gray_frame, min_size=MIN_FACE):
+    return get_face_cascade().detectMultiScale(gray_frame, scaleFactor=1.1, minNeighbors=5, minSize=(min_size, min_size))
+
+def scale_boxes(boxes, factor):
+    # Detection-image boxes -> 640x480 preprocessing coordinates
+    if factor == 1:
+        return boxes
+    return [tuple(int(round(v * factor)) for v in box) for box in boxes]
+
+register_model("face_cascade", build_face_cascade, warm_up=lambda cascade: detect_faces(np.zeros(DETECT_SIZE[::-1], dtype=np.uint8)))
+
+class FaceTracker:
+    """
+    Per-session face state. Between full-frame detections the last box is followed with a
+    template match inside a padded search region; when the match is weak the cascade is run
+    on that region, and only if that also fails (or on schedule) on the whole frame.
+    Small and picklable so it can travel to a process-pool worker with the frame.
+    Works on the detection image, so boxes are in DETECT_SIZE coordinates.
+    """
+
+    def __init__(self, redetect_interval=FACE_REDETECT_INTERVAL, padding=FACE_SEARCH_PADDING, min_score=FACE_TRACK_MIN_SCORE):
+        self.redetect_interval = redetect_interval
+        self.padding = padding
+        self.min_score = min_score
+        self.box = None          # (x, y, w, h) of the last face
+        self.template = None     # grayscale patch of the last face
+        self.frames_since_detect = 0
+        self.confidence = 0.0
+
+    def reset(self):
+        self.box = None
+        self.template = None
+        self.confidence = 0.0
+
+    def locate(self, gray_frame):
+        """Same contract as detectMultiScale: a list of (x, y, w, h) boxes."""
+        self.frames_since_detect += 1
+        if self.box is None or self.frames_since_detect >= self.redetect_interval:
+            return self._full_detect(gray_frame)
+
+        x0, y0, region = self._search_region(gray_frame)
+
+        # Cheap path: follow the last face with a template match
+        th, tw = self.template.shape
+        if region.shape[0] >= th and region.shape[1] >= tw:
+            scores = cv2.matchTemplate(region, self.template, cv2.TM_CCOEFF_NORMED)
+            _, score, _, (mx, my) = cv2.minMaxLoc(scores)
+            if score >= self.min_score:
+                self.confidence = score
+                return [self._update(gray_frame, x0 + mx, y0 + my, tw, th)]
+
+        # Tracking lost confidence: run the cascade on the search region only
+        faces = detect_faces(region)
+        if len(faces) == 1:
+            x, y, w, h = faces[0]
+            self.confidence = 1.0
+            return [self._update(gray_frame, x0 + x, y0 + y, w, h)]
+
+        return self._full_detect(gray_frame)
+
+    def _full_detect(self, gray_frame):
+        self.frames_since_detect = 0
+        faces = detect_faces(gray_frame)
+        if len(faces) == 1:
+            x, y, w, h = faces[0]
+            self.confidence = 1.0
+            self._update(gray_frame, x, y, w, h)
+        else:
+            self.reset()   # zero or several faces: nothing single to follow
+        return faces
+
+    def _search_region(self, gray_frame):
+        x, y, w, h = self.box
+        pad_x, pad_y = int(w * self.padding), int(h * self.padding)
+        x0, y0 = max(0, x - pad_x), max(0, y - pad_y)
+        x1 = min(gray_frame.shape[1], x + w + pad_x)
+        y1 = min(gray_frame.shape[0], y + h + pad_y)
+        return x0, y0, gray_frame[y0:y1, x0:x1]
+
+    def _update(self, gray_frame, x, y, w, h):
+        x, y, w, h = int(x), int(y), int(w), int(h)
+        self.box = (x, y, w, h)
+        self.template = gray_frame[y:y+h, x:x+w].copy()
+        return self.box
@@ -0,0 +1,213 @@
+#off-loop frame inference: worker pool + per-session frame queues
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from utils.config_utils import INFERENCE_EXECUTOR, INFERENCE_WORKERS, FRAME_QUEUE_SIZE, EMOTION_BATCH_SIZE, PRELOAD_MODELS
+from utils.decode_utils import decode_frame
+from utils.cache_utils import frame_signature, frame_unchanged
+from utils.emotion_utils import locate_face, predict_emotions
+from utils.model_utils import preload_models
+from utils.pose_utils import estimate_pose, classify_posture
+from utils.video_utils import iter_sampled_frames
+
+logger = logging.getLogger("interview_analyzer")
+
+# --- Worker Side ---
+def init_worker():
+    # Runs once in every worker so the first frame doesn't pay for model loading and warm-up
+    if PRELOAD_MODELS:
+        timings = preload_models()
+        logger.info(f"Inference worker {os.getpid()} ready: {timings}")
+
+def worker_ready():
+    return os.getpid(), threading.get_ident()
+
+def analyze_frame(frame, tracker=None, session_key=None):
+    """
+    Run the per-frame stages except the emotion model, which EmotionBatcher batches across sessions.
+    'face' is the 224x224 crop to classify, or None with the reason in 'emotion'.
+    The (possibly updated) FaceTracker is handed back, since a process worker only has a copy.
+    With a session_key pose runs on that session's own tracking graph in this worker.
+    'timings' holds per-stage seconds for the metrics.
+    """
+    timings = {}
+    face, status, lighting_feedback, center_feedback = locate_face(frame, tracker, timings)
+
+    started = time.perf_counter()
+    posture = "Unknown"
+    face_box = tracker.box if tracker is not None and face is not None else None
+    pose_results = estimate_pose(frame, face_box, session_key)
+    if pose_results.pose_landmarks:
+        posture = classify_posture(pose_results)
+    timings['pose'] = time.perf_counter() - started
+
+    return {
+        'face': face,
+        'emotion': status,
+        'posture': posture,
+        'lighting_feedback': lighting_feedback,
+        'center_feedback': center_feedback,
+        'tracker': tracker,
+        'timings': timings
+    }
+
+def analyze_encoded_frame(image, tracker=None, reference=None, tolerance=None, session_key=None):
+    """
+    Decode and analyse a live frame. Decoding is CPU work too, so it happens here rather than on the loop.
+    When the frame is within tolerance of the reference signature the models are skipped and
+    the result is {'unchanged': True}; the caller reuses its cached result.
+    """
+    started = time.perf_counter()
+    frame = decode_frame(image)
+    decoded = time.perf_counter()
+    signature = frame_signature(frame)
+    timings = {'decode': decoded - started, 'signature': time.perf_counter() - decoded}
+    if reference is not None and frame_unchanged(signature, reference, tolerance):
+        return {'unchanged': True, 'signature': signature, 'tracker': tracker, 'timings': timings}
+
+    analysis = analyze_frame(frame, tracker, session_key)
+    analysis['timings'].update(timings)
+    analysis.update(unchanged=False, signature=signature)
+    return analysis
+
+def analyze_segment(video_path, start_seconds, end_seconds, sample_seconds):
+    """
+    Analyse the sampled frames of one time segment of a video, inside a worker.
+    Emotion predictions are batched within the segment; face crops are dropped before
+    returning so only the small per-sample records travel back to the caller.
+    """
+    records, waiting = [], []
+    for frame_index, seconds, frame in iter_sampled_frames(video_path, sample_seconds, start_seconds, end_seconds):
+        try:
+            analysis = analyze_frame(frame)
+        except Exception as e:
+            logger.error(f"[Frame {frame_index}] Error: {e}")
+            continue
+
+        del analysis['tracker'], analysis['timings']
+        analysis.update(frame_index=frame_index, seconds=seconds, prediction=None)
+        records.append(analysis)
+        if analysis['face'] is not None:
+            waiting.append(analysis)
+        if len(waiting) >= EMOTION_BATCH_SIZE:
+            predict_waiting(waiting)
+
+    predict_waiting(waiting)
+    return records
+
+def predict_waiting(waiting):
+    try:
+        predictions = predict_emotions([analysis['face'] for analysis in waiting])
+    except Exception as e:
+        logger.error(f"Emotion batch of {len(waiting)} failed: {e}")
+        predictions = [None] * len(waiting)
+
+    for analysis, prediction in zip(waiting, predictions):
+        analysis['prediction'] = prediction
+        analysis['face'] = None
+    waiting.clear()
+
+# --- Executor ---
+class InferencePool:
+    """
+    Process or thread workers that run the models away from the asyncio loop.
+    Each worker is its own single-worker executor so calls with a key (a session id) always land
+    on the same worker, where that session's stateful models live. Calls without a key go to
+    the least busy worker.
+    """
+
+    def __init__(self, kind=INFERENCE_EXECUTOR, workers=INFERENCE_WORKERS):
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.in_flight = 0
+        self._busy = [0] * self.workers
+        self._executors = []
+
+    def _new_executor(self, index):
+        if self.kind == "process":
+            # spawn, not fork: the parent may already hold TensorFlow/MediaPipe state
+            return ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+            )
+        if self.kind == "thread":
+            return ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix=f"inference-{index}",
+                initializer=init_worker,
+            )
+        raise ValueError(f"Unknown inference executor: {self.kind!r}")
+
+    def start(self):
+        if self._executors:
+            return
+        self._executors = [self._new_executor(index) for index in range(self.workers)]
+        logger.info(f"Inference pool started ({self.kind}, {self.workers} workers)")
+
+    def worker_for(self, key=None):
+        if key is None:
+            return min(range(self.workers), key=self._busy.__getitem__)
+        return zlib.crc32(str(key).encode()) % self.workers   # stable, unlike hash() on str
+
+    async def run(self, fn, *args, key=None):
+        if not self._executors:
+            self.start()
+        loop = asyncio.get_running_loop()
+        index = self.worker_for(key)
+        self.in_flight += 1
+        self._busy[index] += 1
+        try:
+            return await loop.run_in_executor(self._executors[index], fn, *args)
+        finally:
+            self.in_flight -= 1
+            self._busy[index] -= 1
+
+    async def warm_up(self):
+        """Start every worker (running init_worker) before traffic arrives. Returns how many answered."""
+        if not self._executors:
+            self.start()
+        loop = asyncio.get_running_loop()
+        workers = await asyncio.gather(*(loop.run_in_executor(executor, worker_ready) for executor in self._executors))
+        return len(set(workers))
+
+    def load(self):
+        # >1 means calls are waiting for a free worker
+        return self.in_flight / self.workers
+
+    def shutdown(self):
+        for executor in self._executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._executors = []
+
+# --- Per-Session Backpressure ---
+class LatestFrameQueue:
+    """Bounded frame queue. When full the oldest frame is dropped, so the newest one is always kept."""
+
+    def __init__(self, maxsize=FRAME_QUEUE_SIZE):
+        self._frames = deque(maxlen=max(1, maxsize))
+        self._ready = asyncio.Event()
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self._frames)
+
+    def put(self, item):
+        if len(self._frames) == self._frames.maxlen:
+            self.dropped += 1
+        self._frames.append(item)
+        self._ready.set()
+
+    async def get(self):
+        while not self._frames:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._frames.popleft()
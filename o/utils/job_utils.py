@@ -0,0 +1,243 @@
+#background analysis jobs for uploaded videos
+
+import asyncio
+import logging
+import math
+import uuid
+from datetime import datetime
+
+import cv2
+
+from utils.batch_utils import finalize_emotion
+from utils.config_utils import JOB_SEGMENT_SECONDS, JOB_RETENTION_SECONDS
+from utils.feedback_utils import get_feedback
+from utils.inference_utils import analyze_segment
+from utils.session_utils import Session
+from utils.summary_utils import generate_session_summary
+
+logger = logging.getLogger("interview_analyzer")
+
+def get_video_duration(video_path):
+    cap = cv2.VideoCapture(video_path)
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        if fps == 0:
+            raise ValueError("Could not get video FPS.")
+        return cap.get(cv2.CAP_PROP_FRAME_COUNT) / fps
+    finally:
+        cap.release()
+
+def split_segments(duration, sample_seconds, segment_seconds=JOB_SEGMENT_SECONDS):
+    """
+    (start, end) seconds per segment. The last one is open-ended (end None) and reads to EOF,
+    since the frame count behind `duration` can be short or missing (unindexed streams,
+    MediaRecorder webm). Without a usable duration the whole video is one segment.
+    """
+    if not duration > 0:
+        return [(0.0, None)]
+    # Segment length is a whole number of sample steps, so the samples match a serial pass
+    steps = max(1, round(segment_seconds / sample_seconds))
+    length = steps * sample_seconds
+    count = max(1, math.ceil(duration / length))
+    return [(i * length, (i + 1) * length if i < count - 1 else None) for i in range(count)]
+
+def replay_records(records, stats):
+    """
+    Feed per-sample records (in video order) into a SessionStats, as the live loop does per frame.
+    Yields (record, emotion, posture, feedback).
+    """
+    for record in records:
+        emotion = finalize_emotion(record, stats)
+        posture = record['posture']
+        if emotion != "Unknown":
+            stats.add_emotion(emotion)
+        if posture != "Unknown":
+            stats.add_posture(posture)
+
+        feedback = get_feedback(emotion, posture)
+        if record['lighting_feedback']:
+            feedback.append(record['lighting_feedback'])
+        if record['center_feedback']:
+            feedback.append(record['center_feedback'])
+
+        yield record, emotion, posture, feedback
+
+def normalize_summary(summary):
+    # Upload summaries use the key names the upload page expects
+    summary['most_common_emotion'] = summary.pop('dominant_emotion', 'N/A')
+    summary['most_common_posture'] = summary.pop('dominant_posture', 'N/A')
+    return summary
+
+class Job:
+    def __init__(self, session_id, video_path, sample_seconds):
+        self.job_id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.video_path = video_path
+        self.sample_seconds = sample_seconds
+        self.status = "queued"       # queued -> running -> done / failed / cancelled
+        self.created = datetime.now()
+        self.finished = None
+        self.segments = []           # (start_seconds, end_seconds)
+        self.results = {}            # segment index -> records
+        self.summary = None
+        self.error = None
+        self.task = None
+        self.live = self.new_session()   # running replay of the segments finished so far
+        self.replayed = 0                # segments already fed into `live` (a prefix, in video order)
+        self.events = []                 # (event, data) as streamed to /jobs/{id}/events
+        self._wakeup = asyncio.Event()
+
+    def records(self):
+        # Finished segments only, in video order
+        return (record for i in sorted(self.results) for record in self.results[i])
+
+    def new_session(self):
+        return Session(self.session_id, self.created)
+
+    def partial_summary(self):
+        return normalize_summary(generate_session_summary(self.live, datetime.now()))
+
+    # --- Streaming ---
+    def publish(self, event, data):
+        self.events.append((event, data))
+        self._wakeup.set()
+        self._wakeup = asyncio.Event()
+
+    def advance(self):
+        """
+        Replay newly finished segments into the running session, in video order, and publish each
+        sampled frame plus an updated partial summary. Segments finishing out of order wait for
+        the ones before them, so smoothing sees frames exactly as a serial pass would.
+        """
+        if self.finished:   # a segment that was still running when the job failed
+            return
+        while self.replayed in self.results:
+            for record, emotion, posture, feedback in replay_records(self.results[self.replayed], self.live.stats):
+                self.publish('frame', {
+                    'frame_index': record['frame_index'],
+                    'seconds': round(record['seconds'], 2),
+                    'emotion': emotion,
+                    'posture': posture,
+                    'feedback': feedback
+                })
+            self.replayed += 1
+        self.publish('progress', {
+            'segments_done': len(self.results),
+            'segments_total': len(self.segments),
+            'progress': self.progress(),
+            'partial_summary': self.partial_summary()
+        })
+
+    async def stream(self, start=0, heartbeat=15.0):
+        """Yield (index, event, data) from `start` on until the job has finished; (None, None, None) as a keep-alive."""
+        index = start
+        while True:
+            while index < len(self.events):
+                event, data = self.events[index]
+                yield index, event, data
+                index += 1
+            if self.finished:
+                return
+            wakeup = self._wakeup
+            try:
+                await asyncio.wait_for(wakeup.wait(), heartbeat)
+            except asyncio.TimeoutError:
+                yield None, None, None
+
+    def progress(self):
+        return round(100 * len(self.results) / len(self.segments), 1) if self.segments else 0.0
+
+    def to_dict(self):
+        info = {
+            'job_id': self.job_id,
+            'session_id': self.session_id,
+            'status': self.status,
+            'segments_total': len(self.segments),
+            'segments_done': len(self.results),
+            'progress': self.progress(),
+        }
+        if self.summary is not None:
+            info['summary'] = self.summary
+        elif self.replayed:
+            info['partial_summary'] = self.partial_summary()
+        if self.error:
+            info['error'] = self.error
+        return info
+
+class JobManager:
+    """
+    Runs upload analyses in the background, one pool task per video segment.
+    The pool should be a separate one from the live frames'. At most one segment per worker is
+    handed to it at a time, so jobs take turns and a cancelled job leaves nothing queued behind.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.jobs = {}
+        self._tasks = set()
+        self._slots = asyncio.Semaphore(pool.workers)
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def submit(self, session_id, video_path, sample_seconds, on_done=None):
+        self.prune()
+        job = Job(session_id, video_path, sample_seconds)
+        self.jobs[job.job_id] = job
+        task = asyncio.create_task(self._run(job, on_done))
+        job.task = task
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def cancel(self, job_id):
+        """Stop a running job. Segments not started yet are dropped; running ones finish but are ignored."""
+        job = self.jobs.get(job_id)
+        if job is not None and job.finished is None and job.task is not None:
+            job.task.cancel()
+        return job
+
+    def prune(self, max_age=JOB_RETENTION_SECONDS):
+        # Forget finished jobs once nobody is likely to poll them any more
+        now = datetime.now()
+        for job_id, job in list(self.jobs.items()):
+            if job.finished and (now - job.finished).total_seconds() > max_age:
+                del self.jobs[job_id]
+
+    async def _run(self, job, on_done):
+        job.status = "running"
+        try:
+            duration = await asyncio.to_thread(get_video_duration, job.video_path)
+            job.segments = split_segments(duration, job.sample_seconds)
+
+            async def run_segment(index, start, end):
+                async with self._slots:
+                    job.results[index] = await self.pool.run(analyze_segment, job.video_path, start, end, job.sample_seconds)
+                job.advance()
+
+            # A failing segment cancels the rest, so a dead job doesn't keep holding pool slots
+            async with asyncio.TaskGroup() as segments:
+                for i, (start, end) in enumerate(job.segments):
+                    segments.create_task(run_segment(i, start, end))
+
+            if on_done is not None:
+                job.summary = await on_done(job)
+            job.status = "done"
+            outcome = {'summary': job.summary}
+            logger.info(f"Job {job.job_id} finished ({len(job.segments)} segments)")
+
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            outcome = {'segments_done': len(job.results), 'partial_summary': job.partial_summary()}
+            logger.info(f"Job {job.job_id} cancelled after {len(job.results)}/{len(job.segments)} segments")
+
+        except Exception as e:
+            if isinstance(e, ExceptionGroup):
+                e = e.exceptions[0]   # the segment that failed first
+            job.status = "failed"
+            job.error = str(e)
+            outcome = {'error': job.error}
+            logger.error(f"Job {job.job_id} failed: {e}")
+
+        job.finished = datetime.now()
+        job.publish(job.status, outcome)   # last event: "done", "cancelled" or "failed"; streams close after it
@@ -1,24 +1,164 @@
 import csv
 import os
-import json
 from datetime import datetime
 import asyncio
+import atexit
+import logging
+import queue
+import threading
+import time
 
-csv_lock = asyncio.Lock()
+from utils.metrics_utils import stage_timer
+from utils.config_utils import (
+    LOG_MODE, LOG_BATCH_SIZE, LOG_FLUSH_INTERVAL, LOG_QUEUE_SIZE, LOG_QUEUE_POLICY, LOG_MAX_BYTES, LOG_ROTATE_SECONDS
+)
+
+logger = logging.getLogger("interview_analyzer")
+
+LOG_HEADER = ["Session_ID", "Timestamp", "Emotion", "Posture", "Feedback"]
+
+class CsvLogWriter:
+    """
+    Background writer for the feedback log. Rows go into a bounded in-memory queue and a
+    dedicated thread writes them in batches, so callers never touch the file. Files are only
+    ever appended to; the shared file is rotated by size or age. close() flushes everything.
+    """
+
+    def __init__(self, path, mode=LOG_MODE, batch_size=LOG_BATCH_SIZE, flush_interval=LOG_FLUSH_INTERVAL,
+                 queue_size=LOG_QUEUE_SIZE, policy=LOG_QUEUE_POLICY, max_bytes=LOG_MAX_BYTES,
+                 rotate_seconds=LOG_ROTATE_SECONDS):
+        self.path = path
+        self.mode = mode
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.policy = policy
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.dropped = 0
+        self.written = 0
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._file = None
+        self._opened = 0.0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="csv-log-writer", daemon=True)
+        self._thread.start()
+
+    # --- Producer Side ---
+    def write(self, row):
+        """Queue a row without blocking. Returns False if it was dropped because the queue is full."""
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    async def write_async(self, row):
+        if self.policy != "block":
+            self.write(row)
+            return
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            # Backpressure: wait for room instead of dropping
+            await asyncio.to_thread(self._queue.put, row)
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    # --- Writer Thread ---
+    def _run(self):
+        done = False
+        while not done:
+            row = self._queue.get()
+            if row is None:
+                break
+
+            # Collect a batch until it is full or the flush interval has passed
+            batch = [row]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    row = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if row is None:
+                    done = True
+                    break
+                batch.append(row)
+
+            try:
+                with stage_timer("log_write"):
+                    self._write_batch(batch)
+            except Exception as e:
+                logger.error(f"Feedback log write of {len(batch)} rows failed: {e}")
+
+        if self._file is not None:
+            self._file.close()
+
+    def _write_batch(self, rows):
+        if self.mode == "session":
+            by_session = {}
+            for row in rows:
+                by_session.setdefault(row[0], []).append(row)
+            base = os.path.splitext(self.path)[0]
+            for session_id, session_rows in by_session.items():
+                with open_log(f"{base}_{session_id}.csv") as file:
+                    csv.writer(file).writerows(session_rows)
+        else:
+            self._rotate_if_needed()
+            if self._file is None:
+                self._file = open_log(self.path)
+                self._opened = time.time()
+            csv.writer(self._file).writerows(rows)
+            self._file.flush()
+        self.written += len(rows)
+
+    def _rotate_if_needed(self):
+        if self._file is None:
+            return
+        too_big = self.max_bytes and self._file.tell() >= self.max_bytes
+        too_old = self.rotate_seconds and time.time() - self._opened >= self.rotate_seconds
+        if too_big or too_old:
+            self._file.close()
+            self._file = None
+            base, ext = os.path.splitext(self.path)
+            os.replace(self.path, f"{base}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}{ext}")
+
+def open_log(path):
+    # Append-only; the header is written only when the file is new
+    file = open(path, mode="a", newline="", encoding="utf-8")
+    if file.tell() == 0:
+        csv.writer(file).writerow(LOG_HEADER)
+    return file
+
+log_writers = {}
+
+def get_log_writer(path="feedback_log.csv"):
+    if path not in log_writers:
+        log_writers[path] = CsvLogWriter(path)
+    return log_writers[path]
+
+def close_log_writers():
+    for writer in log_writers.values():
+        writer.close()
+
+atexit.register(close_log_writers)
 
 def initialize_log_file(path="feedback_log.csv"):
-    # The file is overwritten every time a new session starts
-    with open(path, mode="w", newline="", encoding="utf-8") as file:
-        writer = csv.writer(file)
-        writer.writerow(["Session_ID", "Timestamp", "Emotion", "Posture", "Feedback"])
+    # Starts the background writer; existing logs are kept, never truncated
+    get_log_writer(path)
 
 async def log_to_csv(row, path="feedback_log.csv"):
-    async with csv_lock:
-        with open(path, mode="a", newline="", encoding="utf-8") as file:
-            writer = csv.writer(file)
-            writer.writerow(row)
-
-def save_session_summary(session_id, summary):
-    os.makedirs("summaries", exist_ok=True)
-    with open(f"summaries/{session_id}_summary.json", "w", encoding="utf-8") as f:
-        json.dump(summary, f, indent=2)
\ No newline at end of file
+    await get_log_writer(path).write_async(row)
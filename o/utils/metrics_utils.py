@@ -0,0 +1,170 @@
+#low-overhead pipeline metrics, rendered in the Prometheus text format for /metrics
+
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+def label_key(labels):
+    return tuple(sorted(labels.items()))
+
+def format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+class Histogram:
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = buckets
+        self.series = {}    # label key -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in self.series.items():
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{self.name}_bucket{format_labels(key, [('le', bound)])} {cumulative}")
+                lines.append(f"{self.name}_bucket{format_labels(key, [('le', '+Inf')])} {count}")
+                lines.append(f"{self.name}_sum{format_labels(key)} {total}")
+                lines.append(f"{self.name}_count{format_labels(key)} {count}")
+        return lines
+
+class CounterMetric:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.series = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = label_key(labels)
+        with self._lock:
+            self.series[key] = self.series.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            lines += [f"{self.name}{format_labels(key)} {value}" for key, value in self.series.items()]
+        return lines
+
+class Gauge:
+    """Value read at scrape time from `collect()`, which returns a number or a {labels dict key: value} mapping."""
+
+    def __init__(self, name, help_text, collect):
+        self.name = name
+        self.help = help_text
+        self.collect = collect
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        values = self.collect()
+        if isinstance(values, dict):
+            lines += [f"{self.name}{format_labels(key)} {value}" for key, value in values.items()]
+        else:
+            lines.append(f"{self.name} {values}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(name, help_text, buckets))
+
+    def counter(self, name, help_text):
+        return self._add(CounterMetric(name, help_text))
+
+    def gauge(self, name, help_text, collect):
+        return self._add(Gauge(name, help_text, collect))
+
+    def _add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            try:
+                lines += metric.render()
+            except Exception:
+                continue   # a broken gauge shouldn't take /metrics down
+        return "\n".join(lines) + "\n"
+
+# --- Pipeline Metrics ---
+metrics = MetricsRegistry()
+
+stage_seconds = metrics.histogram("pipeline_stage_seconds", "Time spent per pipeline stage")
+frame_seconds = metrics.histogram("frame_processing_seconds", "Time from dequeuing a live frame to emitting its feedback")
+emotion_batch_size = metrics.histogram("emotion_batch_size", "Face crops per emotion forward pass", buckets=(1, 2, 4, 8, 16, 32, 64))
+frames_total = metrics.counter("frames_processed_total", "Live frames analysed")
+frames_dropped = metrics.counter("frames_dropped_total", "Live frames replaced by a newer one before analysis")
+frame_errors = metrics.counter("frame_errors_total", "Live frames that failed to process")
+cache_lookups = metrics.counter("result_cache_lookups_total", "Near-duplicate frame cache lookups")
+
+def observe_stages(timings):
+    # Stage timings measured inside a worker and returned with its result
+    for stage, seconds in timings.items():
+        stage_seconds.observe(seconds, stage=stage)
+
+@contextmanager
+def stage_timer(stage):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_seconds.observe(time.perf_counter() - started, stage=stage)
+
+# --- Process Memory ---
+def resident_memory_bytes(pid="self"):
+    # Linux (/proc) only; 0 elsewhere
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+def child_pids():
+    # Process-pool workers are our direct children
+    if not os.path.isdir("/proc"):
+        return []
+    parent, children = os.getpid(), []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()   # the command name may contain spaces
+        except (OSError, IndexError):
+            continue
+        if int(fields[1]) == parent:
+            children.append(entry)
+    return children
+
+def process_memory():
+    return {
+        (('process', 'server'),): resident_memory_bytes(),
+        (('process', 'workers'),): sum(resident_memory_bytes(pid) for pid in child_pids()),
+    }
+
+metrics.gauge("process_resident_memory_bytes", "Resident memory of the server and its inference workers", process_memory)
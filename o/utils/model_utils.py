@@ -0,0 +1,42 @@
+#model registry: owns the loaded models so they can be swapped out (e.g. for stubs in benchmarks)
+#Heavy libraries are imported by the loaders, so nothing is imported until a model is first needed.
+
+import threading
+import time
+
+model_loaders = {}
+model_warmers = {}
+loaded_models = {}
+warm_models = set()
+models_lock = threading.Lock()
+
+def register_model(name, loader, warm_up=None):
+    # warm_up(model) runs the model once on a dummy input so lazy init happens before real traffic
+    model_loaders[name] = loader
+    if warm_up is not None:
+        model_warmers[name] = warm_up
+
+def get_model(name):
+    model = loaded_models.get(name)
+    if model is None:
+        with models_lock:
+            if name not in loaded_models:
+                loaded_models[name] = model_loaders[name]()
+            model = loaded_models[name]
+    return model
+
+def override_model(name, model):
+    # Replace a model for this process, e.g. with a stub that needs no weights
+    loaded_models[name] = model
+
+def preload_models(names=None, warm=True):
+    """Load, and optionally warm up, the given (default: all registered) models. Returns seconds per model."""
+    timings = {}
+    for name in names or list(model_loaders):
+        started = time.perf_counter()
+        model = get_model(name)
+        if warm and name in model_warmers and name not in warm_models:
+            model_warmers[name](model)
+            warm_models.add(name)
+        timings[name] = round(time.perf_counter() - started, 3)
+    return timings
@@ -1,26 +1,192 @@
 #pose detection, classification
 
-import mediapipe as mp
+import threading
+from collections import OrderedDict
+from types import SimpleNamespace
 
-mp_pose = mp.solutions.pose
-pose= mp_pose.Pose()
+import cv2
+import numpy as np
+
+from utils.config_utils import POSE_BACKEND, POSE_MODEL_COMPLEXITY, POSE_EVERY_N_FRAMES, POSE_INPUT_MAX_SIDE, POSE_MAX_SESSIONS
+from utils.face_utils import DETECT_SIZE
+from utils.model_utils import register_model, get_model
+
+# MediaPipe PoseLandmark indices, so classifying doesn't need mediapipe imported
+NOSE, LEFT_EAR, RIGHT_EAR, LEFT_SHOULDER, RIGHT_SHOULDER = 0, 7, 8, 11, 12
+FACE_SPACE = DETECT_SIZE   # FaceTracker boxes are in detection-image coordinates
+
+def build_pose(static_image_mode=True):
+    """
+    A MediaPipe Pose graph. Stateless (static_image_mode) for unrelated stills such as upload samples;
+    live sessions get their own tracking graph from PoseEstimatorPool.
+    """
+    if POSE_BACKEND == "stub":
+        from utils.stub_models import StubPose
+        return StubPose()
+    import mediapipe as mp   # only on first use
+    return mp.solutions.pose.Pose(
+        static_image_mode=static_image_mode,
+        model_complexity=POSE_MODEL_COMPLEXITY,
+        smooth_landmarks=not static_image_mode,
+    )
+
+register_model("pose", build_pose, warm_up=lambda pose: pose.process(np.zeros((256, 256, 3), dtype=np.uint8)))
+pose_lock = threading.Lock()  # the shared graph is not safe to call from several threads at once
 
 def get_pose_results(frame):
-    # Process the frame with MediaPipe Pose
-    results = pose.process(frame)
+    # Process a full RGB frame with the shared MediaPipe Pose graph
+    with pose_lock:
+        results = get_model("pose").process(frame)
     return results
 
+# --- Upper-Body Region ---
+def upper_body_roi(frame_shape, face_box=None):
+    """
+    (x0, y0, x1, y1) around the head and shoulders, from a face box in FACE_SPACE coordinates.
+    Without a face box the whole frame is used.
+    """
+    height, width = frame_shape[:2]
+    if face_box is None:
+        return 0, 0, width, height
+    sx, sy = width / FACE_SPACE[0], height / FACE_SPACE[1]
+    x, y, w, h = face_box[0] * sx, face_box[1] * sy, face_box[2] * sx, face_box[3] * sy
+    center_x = x + w / 2
+    x0, x1 = int(max(0, center_x - 2.5 * w)), int(min(width, center_x + 2.5 * w))
+    y0, y1 = int(max(0, y - 0.5 * h)), int(min(height, y + 4.5 * h))
+    if x1 - x0 < 16 or y1 - y0 < 16:
+        return 0, 0, width, height
+    return x0, y0, x1, y1
+
+def roi_still_fits(roi, frame_shape, face_box):
+    # Keep the region while the face stays near where it was, so the graph's tracking isn't reset by jitter
+    if roi is None:
+        return False
+    return abs(np.subtract(upper_body_roi(frame_shape, face_box), roi)).max() < 0.1 * (roi[2] - roi[0])
+
+def run_pose_on_roi(pose, frame, roi):
+    """Downscale the region, convert only it to RGB, and map the landmarks back to full-frame normalized coordinates."""
+    x0, y0, x1, y1 = roi
+    crop = frame[y0:y1, x0:x1]
+    roi_w, roi_h = x1 - x0, y1 - y0
+    scale = min(1.0, POSE_INPUT_MAX_SIDE / max(roi_w, roi_h))
+    if scale < 1.0:
+        crop = cv2.resize(crop, (max(1, int(roi_w * scale)), max(1, int(roi_h * scale))), interpolation=cv2.INTER_AREA)
+    results = pose.process(cv2.cvtColor(crop, cv2.COLOR_BGR2RGB))
+    if not results.pose_landmarks:
+        return SimpleNamespace(pose_landmarks=None)
+
+    height, width = frame.shape[:2]
+    landmarks = [
+        SimpleNamespace(
+            x=(x0 + lm.x * roi_w) / width,
+            y=(y0 + lm.y * roi_h) / height,
+            z=lm.z * roi_w / width,      # z shares x's scale (the input width)
+            visibility=lm.visibility,
+        )
+        for lm in results.pose_landmarks.landmark
+    ]
+    return SimpleNamespace(pose_landmarks=SimpleNamespace(landmark=landmarks))
+
+# --- Per-Session Estimators ---
+class PoseSession:
+    def __init__(self, pose):
+        self.pose = pose
+        self.lock = threading.Lock()
+        self.roi = None
+        self.results = None
+        self.frames = 0
+        self.closed = False
+
+    def close(self):
+        # Under the session lock, so a graph is never closed while another thread runs it
+        with self.lock:
+            if not self.closed:
+                self.closed = True
+                self.pose.close()
+
+class PoseEstimatorPool:
+    """
+    One tracking Pose graph per live session, inside each worker. A graph carries landmarks from
+    one frame to the next, so frames of different users must not share one; InferencePool routes
+    a session's frames to the same worker, and this keeps its graph. Least recently used
+    sessions are closed past max_sessions.
+    """
+
+    def __init__(self, max_sessions=POSE_MAX_SESSIONS, every_n_frames=POSE_EVERY_N_FRAMES, factory=None):
+        self.factory = factory or (lambda: build_pose(static_image_mode=False))
+        self.max_sessions = max(1, max_sessions)
+        self.every_n_frames = max(1, every_n_frames)
+        self.sessions = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _session(self, key):
+        with self.lock:
+            session = self.sessions.get(key)
+            if session is not None:
+                self.sessions.move_to_end(key)
+                return session
+        created = PoseSession(self.factory())   # outside the lock: building a graph is slow
+        evicted = []
+        with self.lock:
+            session = self.sessions.setdefault(key, created)
+            self.sessions.move_to_end(key)
+            while len(self.sessions) > self.max_sessions:
+                evicted.append(self.sessions.popitem(last=False)[1])
+        if session is not created:
+            evicted.append(created)   # another thread got there first
+        for old in evicted:
+            old.close()
+        return session
+
+    def estimate(self, key, frame, face_box=None):
+        """Landmarks for this session's frame; on skipped frames the last landmarks are returned."""
+        while True:
+            session = self._session(key)
+            with session.lock:
+                if session.closed:
+                    continue   # evicted between lookup and lock: start over on a fresh graph
+                session.frames += 1
+                carried = session.results is not None and session.results.pose_landmarks
+                if carried and (session.frames - 1) % self.every_n_frames:
+                    return session.results
+                if not roi_still_fits(session.roi, frame.shape, face_box):
+                    session.roi = upper_body_roi(frame.shape, face_box)
+                session.results = run_pose_on_roi(session.pose, frame, session.roi)
+                return session.results
+
+    def release(self, key):
+        with self.lock:
+            session = self.sessions.pop(key, None)
+        if session is not None:
+            session.close()
+
+pose_estimators = PoseEstimatorPool()   # one per worker process
+
+def estimate_pose(frame, face_box=None, session_key=None):
+    """
+    Pose landmarks for a BGR frame, run on the upper body around face_box when known.
+    With a session_key the session's own tracking graph is used (and may skip frames);
+    without one the shared stateless graph is.
+    """
+    if session_key is not None:
+        return pose_estimators.estimate(session_key, frame, face_box)
+    with pose_lock:
+        return run_pose_on_roi(get_model("pose"), frame, upper_body_roi(frame.shape, face_box))
+
+def release_pose_session(session_key):
+    pose_estimators.release(session_key)
+
 def classify_posture(results):
     # Classify the posture based on landmarks
     if not results.pose_landmarks:
         return "No Pose Detected"
 
     landmarks = results.pose_landmarks.landmark
-    left_shoulder = landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER]
-    right_shoulder = landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER]
-    nose = landmarks[mp_pose.PoseLandmark.NOSE]
-    left_ear = landmarks[mp_pose.PoseLandmark.LEFT_EAR]
-    right_ear = landmarks[mp_pose.PoseLandmark.RIGHT_EAR]
+    left_shoulder = landmarks[LEFT_SHOULDER]
+    right_shoulder = landmarks[RIGHT_SHOULDER]
+    nose = landmarks[NOSE]
+    left_ear = landmarks[LEFT_EAR]
+    right_ear = landmarks[RIGHT_EAR]
 
     posture = "Upright"
 
@@ -0,0 +1,55 @@
+#server-driven capture rate: per-session target interval/resolution from measured load
+
+from utils.config_utils import (
+    CAPTURE_WIDTH, CAPTURE_HEIGHT, CAPTURE_INTERVAL_MS, RATE_MIN_INTERVAL_MS, RATE_MAX_INTERVAL_MS, RATE_HEADROOM
+)
+
+RESOLUTION_SCALES = (1.0, 0.75, 0.5)
+
+class AdaptiveRate:
+    """
+    Tracks one session's processing latency (EWMA) and turns it, together with the queue
+    state and the pool's overall load, into the capture interval and resolution the client
+    should use. Backs off quickly when overloaded and recovers slowly.
+    """
+
+    def __init__(self, min_interval=RATE_MIN_INTERVAL_MS, max_interval=RATE_MAX_INTERVAL_MS, headroom=RATE_HEADROOM):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.headroom = headroom
+        self.latency_ms = None
+        self.interval_ms = float(CAPTURE_INTERVAL_MS)
+        self.scale_index = 0
+        self.last_dropped = 0
+
+    def observe(self, latency_ms, queue_depth=0, dropped=0, load=0.0):
+        """Record one processed frame. `dropped` is the session's running drop count, `load` pool busy ratio."""
+        if self.latency_ms is None:
+            self.latency_ms = latency_ms
+        else:
+            self.latency_ms = 0.8 * self.latency_ms + 0.2 * latency_ms
+
+        target = self.latency_ms * self.headroom * max(1.0, load)
+        if queue_depth or dropped > self.last_dropped:
+            target = max(target, self.interval_ms * 1.25)   # frames are piling up: back off
+        self.last_dropped = dropped
+
+        if target > self.interval_ms:
+            self.interval_ms = target
+        else:
+            self.interval_ms = 0.9 * self.interval_ms + 0.1 * target
+        self.interval_ms = min(max(self.interval_ms, self.min_interval), self.max_interval)
+
+        # Once the interval is maxed out, shrink the frames; restore them when there is room again
+        if self.interval_ms >= self.max_interval and target > self.max_interval:
+            self.scale_index = min(self.scale_index + 1, len(RESOLUTION_SCALES) - 1)
+        elif self.interval_ms < self.max_interval / 2:
+            self.scale_index = max(self.scale_index - 1, 0)
+
+    def target(self):
+        scale = RESOLUTION_SCALES[self.scale_index]
+        return {
+            'interval_ms': int(self.interval_ms),
+            'width': int(CAPTURE_WIDTH * scale),
+            'height': int(CAPTURE_HEIGHT * scale)
+        }
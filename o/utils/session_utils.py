@@ -1,15 +1,110 @@
+#session records, ids and the in-process session store
+
+import asyncio
+import heapq
+import itertools
+import time
+import uuid
+import zlib
 from datetime import datetime
-from collections import deque
-
-def get_session_template():
-    return {
-        'session_active': False,
-        'session_id': None,
-        'emotion_history': deque(maxlen=100),
-        'posture_history': deque(maxlen=100),
-        'start_time': None,
-        'feedback_count': 0
-    }
+
+from utils.config_utils import SESSION_STORE_SHARDS, SESSION_EXPIRY_SECONDS
+from utils.stats_utils import SessionStats
+
+class Session:
+    """One client's session. Slots keep thousands of these small and attribute access cheap."""
+
+    __slots__ = (
+        'session_active', 'session_id', 'stats', 'start_time', 'feedback_count',
+        'frame_queue', 'frame_task', 'face_tracker', 'result_cache', 'rate', 'lock'
+    )
+
+    def __init__(self, session_id=None, start_time=None):
+        self.session_active = False
+        self.session_id = session_id
+        self.stats = SessionStats()
+        self.start_time = start_time
+        self.feedback_count = 0
+        self.frame_queue = None     # LatestFrameQueue, created on start_session
+        self.frame_task = None
+        self.face_tracker = None
+        self.result_cache = None    # FrameResultCache
+        self.rate = None            # AdaptiveRate
+        self.lock = asyncio.Lock()  # serialises ending this session
+
+    def info(self):
+        # What /sessions lists
+        return {
+            'session_active': self.session_active,
+            'session_id': self.session_id,
+            'start_time': self.start_time.strftime("%Y-%m-%d %H:%M:%S") if self.start_time else None,
+            'feedback_count': self.feedback_count,
+            'emotion_count': self.stats.emotion_total,
+            'posture_count': self.stats.posture_total,
+            'dropped_frames': self.frame_queue.dropped if self.frame_queue is not None else 0,
+            'cache_hits': self.result_cache.hits if self.result_cache else 0,
+            'cache_misses': self.result_cache.misses if self.result_cache else 0
+        }
 
 def get_session_id():
-    return datetime.now().strftime("%Y%m%d_%H%M%S")
+    # Sortable timestamp plus a random suffix, so two sessions in the same second don't collide
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+class SessionStore:
+    """
+    Sessions by socket id, split into shards with a lock each, so starting or dropping one
+    session doesn't wait on unrelated ones. Plain lookups need no lock: the event loop is
+    single-threaded and a dict lookup doesn't yield.
+    Ended sessions are put on an expiry heap, so cleanup only looks at sessions that are due.
+    """
+
+    def __init__(self, shards=SESSION_STORE_SHARDS, expiry_seconds=SESSION_EXPIRY_SECONDS):
+        shards = max(1, shards)
+        self.expiry_seconds = expiry_seconds
+        self._shards = [{} for _ in range(shards)]
+        self._locks = [asyncio.Lock() for _ in range(shards)]
+        self._expiry = []                 # (deadline, tiebreak, sid, session)
+        self._tiebreak = itertools.count()
+
+    def _shard(self, sid):
+        return zlib.crc32(sid.encode()) % len(self._shards)
+
+    def lock(self, sid):
+        return self._locks[self._shard(sid)]
+
+    def get(self, sid):
+        return self._shards[self._shard(sid)].get(sid)
+
+    def put(self, sid, session):
+        self._shards[self._shard(sid)][sid] = session
+
+    def pop(self, sid):
+        return self._shards[self._shard(sid)].pop(sid, None)
+
+    def items(self):
+        # A snapshot, so callers can await while walking it
+        return [item for shard in self._shards for item in shard.items()]
+
+    def values(self):
+        return [session for shard in self._shards for session in shard.values()]
+
+    def __len__(self):
+        return sum(len(shard) for shard in self._shards)
+
+    def schedule_expiry(self, sid, session):
+        deadline = time.monotonic() + self.expiry_seconds
+        heapq.heappush(self._expiry, (deadline, next(self._tiebreak), sid, session))
+
+    def pop_expired(self):
+        """Remove ended sessions whose time is up. Entries for replaced or restarted sessions are skipped."""
+        now = time.monotonic()
+        expired = []
+        while self._expiry and self._expiry[0][0] <= now:
+            _, _, sid, session = heapq.heappop(self._expiry)
+            if self.get(sid) is session and not session.session_active:
+                self.pop(sid)
+                expired.append((sid, session))
+        return expired
+
+    def seconds_to_next_expiry(self):
+        return max(0.0, self._expiry[0][0] - time.monotonic()) if self._expiry else None
@@ -0,0 +1,139 @@
+#shared session state: what other workers/nodes need to see (session listings, summaries)
+
+import json
+import logging
+import os
+import socket
+import time
+from collections import OrderedDict
+
+from utils.config_utils import SESSION_BACKEND, REDIS_URL, SUMMARY_TTL_SECONDS
+
+logger = logging.getLogger("interview_analyzer")
+
+NODE_ID = f"{socket.gethostname()}:{os.getpid()}"   # which worker holds a session
+
+class StateBackend:
+    """
+    Session state shared between workers. Live per-session objects (frame queues, trackers)
+    stay in the worker that owns the socket; only listings and summaries go through here.
+    """
+
+    shared = False   # True when other processes can see what is published
+
+    async def publish(self, sessions, ttl):
+        """Store {sid: info} for /sessions on other workers; entries vanish after ttl seconds unless republished."""
+        raise NotImplementedError
+
+    async def remove(self, sid):
+        raise NotImplementedError
+
+    async def list_sessions(self):
+        raise NotImplementedError
+
+    async def save_summary(self, session_id, summary):
+        raise NotImplementedError
+
+    async def get_summary(self, session_id):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+class MemoryStateBackend(StateBackend):
+    """Single-process default: nothing leaves this worker."""
+
+    def __init__(self, max_summaries=1000):
+        self.sessions = {}                # sid -> (expires_at, info)
+        self.summaries = OrderedDict()
+        self.max_summaries = max_summaries
+
+    async def publish(self, sessions, ttl):
+        expires_at = time.monotonic() + ttl
+        for sid, info in sessions.items():
+            self.sessions[sid] = (expires_at, info)
+
+    async def remove(self, sid):
+        self.sessions.pop(sid, None)
+
+    async def list_sessions(self):
+        now = time.monotonic()
+        for sid in [sid for sid, (expires_at, _) in self.sessions.items() if expires_at <= now]:
+            del self.sessions[sid]
+        return {sid: info for sid, (_, info) in self.sessions.items()}
+
+    async def save_summary(self, session_id, summary):
+        self.summaries[session_id] = summary
+        self.summaries.move_to_end(session_id)
+        while len(self.summaries) > self.max_summaries:
+            self.summaries.popitem(last=False)
+
+    async def get_summary(self, session_id):
+        return self.summaries.get(session_id)
+
+class RedisStateBackend(StateBackend):
+    """
+    State in Redis (or anything speaking its protocol). Each session is its own key with a TTL,
+    so sessions of a worker that died drop out on their own.
+    `client` is any redis.asyncio-compatible client, e.g. for a local stand-in.
+    """
+
+    shared = True
+
+    def __init__(self, url=REDIS_URL, client=None, prefix="interview_analyzer", summary_ttl=SUMMARY_TTL_SECONDS):
+        if client is None:
+            try:
+                import redis.asyncio as redis
+            except ImportError as e:
+                raise ImportError("SESSION_BACKEND=redis needs the redis package: pip install redis") from e
+            client = redis.from_url(url or "redis://localhost:6379/0", decode_responses=True)
+        self.client = client
+        self.prefix = prefix
+        self.summary_ttl = summary_ttl
+
+    def _key(self, kind, name=""):
+        return f"{self.prefix}:{kind}:{name}"
+
+    async def publish(self, sessions, ttl):
+        if not sessions:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        for sid, info in sessions.items():
+            pipe.set(self._key("session", sid), json.dumps(info), ex=max(1, int(ttl)))
+        await pipe.execute()
+
+    async def remove(self, sid):
+        await self.client.delete(self._key("session", sid))
+
+    async def list_sessions(self):
+        prefix = self._key("session")
+        keys = [key async for key in self.client.scan_iter(match=f"{prefix}*", count=500)]
+        if not keys:
+            return {}
+        values = await self.client.mget(keys)
+        return {key[len(prefix):]: json.loads(value) for key, value in zip(keys, values) if value is not None}
+
+    async def save_summary(self, session_id, summary):
+        await self.client.set(self._key("summary", session_id), json.dumps(summary), ex=self.summary_ttl)
+
+    async def get_summary(self, session_id):
+        value = await self.client.get(self._key("summary", session_id))
+        return json.loads(value) if value is not None else None
+
+    async def close(self):
+        close = getattr(self.client, "aclose", None) or self.client.close   # aclose() on redis 5+
+        await close()
+
+def build_state_backend(name=SESSION_BACKEND):
+    if name == "memory":
+        return MemoryStateBackend()
+    if name == "redis":
+        return RedisStateBackend()
+    raise ValueError(f"Unknown session backend: {name!r}")
+
+def build_client_manager():
+    """socket.io message queue so any worker can emit to any client; None when running as one process."""
+    if not REDIS_URL:
+        return None
+    import socketio
+    return socketio.AsyncRedisManager(REDIS_URL)
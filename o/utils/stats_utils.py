@@ -0,0 +1,67 @@
+#per-session rolling statistics: ring buffers with running label counts
+
+from collections import Counter, deque
+
+from utils.feedback_utils import summarize_emotions
+
+NON_EMOTIONS = ("No face detected", "Multiple faces detected")
+
+class RollingCounter:
+    """Fixed-size window of labels whose per-label counts are kept up to date on every append."""
+
+    def __init__(self, size):
+        self.items = deque(maxlen=size)
+        self.counts = Counter()
+
+    def __len__(self):
+        return len(self.items)
+
+    def append(self, label):
+        if len(self.items) == self.items.maxlen:
+            oldest = self.items[0]
+            self.counts[oldest] -= 1
+            if not self.counts[oldest]:
+                del self.counts[oldest]
+        self.items.append(label)
+        self.counts[label] += 1
+
+    def most_common(self):
+        # bounded by the number of distinct labels, not the window size
+        return max(self.counts, key=self.counts.get) if self.counts else None
+
+class SessionStats:
+    """
+    Everything the live loop and the end-of-session summary need to know about a
+    session's labels, updated incrementally so no query has to rescan the history.
+    """
+
+    def __init__(self, smoothing_window=10, trend_window=30):
+        self.smoothing = RollingCounter(smoothing_window)   # raw model labels, for smoothing
+        self.trend = RollingCounter(trend_window)           # recent emotion labels, for the live trend
+        self.emotion_counts = Counter()                     # whole session
+        self.posture_counts = Counter()
+        self.emotion_total = 0
+        self.posture_total = 0
+        self.no_face_streak = 0
+
+    def smooth(self, emotion):
+        """Add a confident model label and return the most common label in the smoothing window."""
+        self.smoothing.append(emotion)
+        return self.smoothing.most_common()
+
+    def add_emotion(self, emotion):
+        self.trend.append(emotion)
+        self.emotion_counts[emotion] += 1
+        self.emotion_total += 1
+        self.no_face_streak = self.no_face_streak + 1 if emotion == "No face detected" else 0
+
+    def add_posture(self, posture):
+        self.posture_counts[posture] += 1
+        self.posture_total += 1
+
+    def trend_summary(self):
+        return summarize_emotions(self.trend.counts)
+
+    def emotion_distribution(self):
+        """Full-session emotion counts, without the no-face / multiple-faces markers."""
+        return Counter({emotion: count for emotion, count in self.emotion_counts.items() if emotion not in NON_EMOTIONS})
@@ -0,0 +1,248 @@
+#analytics store: session summaries + per-frame records in SQLite (WAL), with indexed queries
+
+import asyncio
+import atexit
+import json
+import logging
+import queue
+import sqlite3
+import threading
+from datetime import datetime
+
+from utils.config_utils import ANALYTICS_DB_PATH, ANALYTICS_BATCH_SIZE, LOG_FLUSH_INTERVAL, LOG_QUEUE_SIZE
+
+logger = logging.getLogger("interview_analyzer")
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"   # as in the summaries; sorts as text
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    start_time TEXT NOT NULL,
+    end_time TEXT NOT NULL,
+    duration_seconds REAL NOT NULL,
+    total_frames INTEGER NOT NULL,
+    dominant_emotion TEXT,
+    dominant_posture TEXT,
+    summary TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_start ON sessions (start_time);
+CREATE INDEX IF NOT EXISTS sessions_emotion ON sessions (dominant_emotion, start_time);
+CREATE INDEX IF NOT EXISTS sessions_posture ON sessions (dominant_posture, start_time);
+CREATE INDEX IF NOT EXISTS sessions_duration ON sessions (duration_seconds);
+
+-- Summary percentages per label, so averages over many sessions are plain SQL
+CREATE TABLE IF NOT EXISTS session_labels (
+    session_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    label TEXT NOT NULL,
+    percent REAL NOT NULL,
+    PRIMARY KEY (session_id, kind, label)
+);
+
+CREATE TABLE IF NOT EXISTS frames (
+    session_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    emotion TEXT,
+    posture TEXT,
+    feedback TEXT
+);
+CREATE INDEX IF NOT EXISTS frames_session ON frames (session_id, timestamp);
+"""
+
+def connect(path):
+    conn = sqlite3.connect(path, timeout=5.0)
+    conn.execute("PRAGMA journal_mode=WAL")      # readers don't block the writer, nor it them
+    conn.execute("PRAGMA synchronous=NORMAL")    # safe with WAL, far fewer fsyncs
+    conn.execute("PRAGMA busy_timeout=5000")     # several uvicorn workers share the file
+    conn.row_factory = sqlite3.Row
+    return conn
+
+def session_filters(start=None, end=None, dominant_emotion=None, dominant_posture=None,
+                    min_duration=None, max_duration=None, source=None):
+    """WHERE clause + parameters over the indexed sessions columns."""
+    clauses, params = [], []
+    for column, op, value in (
+        ("start_time", ">=", start.strftime(TIME_FORMAT) if start else None),
+        ("start_time", "<", end.strftime(TIME_FORMAT) if end else None),
+        ("dominant_emotion", "=", dominant_emotion),
+        ("dominant_posture", "=", dominant_posture),
+        ("duration_seconds", ">=", min_duration),
+        ("duration_seconds", "<=", max_duration),
+        ("source", "=", source),
+    ):
+        if value is not None:
+            clauses.append(f"{column} {op} ?")
+            params.append(value)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+class AnalyticsStore:
+    """
+    Summaries are written straight away (rare, and wanted visible at once); live frame records
+    go through a bounded queue to a writer thread that inserts them in batches.
+    Queries open their own connection in a thread, which WAL lets run alongside the writer.
+    """
+
+    def __init__(self, path=ANALYTICS_DB_PATH, batch_size=ANALYTICS_BATCH_SIZE,
+                 flush_interval=LOG_FLUSH_INTERVAL, queue_size=LOG_QUEUE_SIZE):
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        conn = connect(path)
+        conn.executescript(SCHEMA)
+        conn.close()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="analytics-writer", daemon=True)
+        self._thread.start()
+
+    # --- Writes ---
+    def add_frame(self, row):
+        """Queue a [session_id, timestamp, emotion, posture, feedback] row; dropped if the queue is full."""
+        try:
+            self._queue.put_nowait(tuple(row))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        conn = connect(self.path)
+        while True:
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                if self._closed:
+                    break
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            batch = [row for row in batch if row is not None]
+            try:
+                with conn:
+                    conn.executemany("INSERT INTO frames VALUES (?, ?, ?, ?, ?)", batch)
+            except sqlite3.Error as e:
+                logger.error(f"Analytics store dropped {len(batch)} frame records: {e}")
+            if stop:
+                break
+        conn.close()
+
+    def _summary_rows(self, summary, source):
+        start = datetime.strptime(summary['start_time'], TIME_FORMAT)
+        end = datetime.strptime(summary['end_time'], TIME_FORMAT)
+        session = (summary['session_id'], source, summary['start_time'], summary['end_time'],
+                   (end - start).total_seconds(), summary.get('total_frames_analyzed', 0),
+                   summary.get('dominant_emotion'), summary.get('dominant_posture'), json.dumps(summary))
+        labels = [
+            (summary['session_id'], kind, label, percent)
+            for kind in ("emotion", "posture")
+            for label, percent in summary.get(f"{kind}_summary", {}).items()
+        ]
+        return session, labels
+
+    def write_batch(self, summaries, frames=(), source="live", replace_frames=False):
+        """
+        Insert many summaries (and frame records) in one transaction. Blocking; for scripts and threads.
+        With replace_frames the summaries' stored frames are deleted first, so re-analysing a video
+        replaces its rows. Off for live/upload summaries, whose frames arrive through add_frame().
+        """
+        sessions, labels = [], []
+        for summary in summaries:
+            session, session_labels = self._summary_rows(summary, source)
+            sessions.append(session)
+            labels.extend(session_labels)
+        conn = connect(self.path)
+        try:
+            with conn:   # one transaction
+                conn.executemany("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", sessions)
+                conn.executemany("DELETE FROM session_labels WHERE session_id = ?", [(row[0],) for row in sessions])
+                conn.executemany("INSERT INTO session_labels VALUES (?, ?, ?, ?)", labels)
+                if replace_frames:
+                    conn.executemany("DELETE FROM frames WHERE session_id = ?", [(row[0],) for row in sessions])
+                conn.executemany("INSERT INTO frames VALUES (?, ?, ?, ?, ?)", frames)
+        finally:
+            conn.close()
+
+    async def save_summary(self, summary, source="live"):
+        await asyncio.to_thread(self.write_batch, [summary], (), source)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout=10)
+
+    # --- Queries ---
+    def _query(self, sql, params=()):
+        conn = connect(self.path)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    async def query(self, sql, params=()):
+        return await asyncio.to_thread(self._query, sql, params)
+
+    async def get_summary(self, session_id):
+        rows = await self.query("SELECT summary FROM sessions WHERE session_id = ?", (session_id,))
+        return json.loads(rows[0]['summary']) if rows else None
+
+    async def find_summaries(self, limit=100, offset=0, **filters):
+        where, params = session_filters(**filters)
+        rows = await self.query(
+            f"SELECT summary FROM sessions{where} ORDER BY start_time DESC LIMIT ? OFFSET ?", (*params, limit, offset)
+        )
+        return [json.loads(row['summary']) for row in rows]
+
+    async def aggregate(self, **filters):
+        """Totals, dominant-label counts and average label shares over the matching sessions."""
+        where, params = session_filters(**filters)
+        totals = (await self.query(
+            f"SELECT COUNT(*) AS sessions, COALESCE(SUM(total_frames), 0) AS total_frames, "
+            f"AVG(duration_seconds) AS avg_duration_seconds FROM sessions{where}", params
+        ))[0]
+        result = dict(totals)
+        sessions = result['sessions']
+        if result['avg_duration_seconds'] is not None:
+            result['avg_duration_seconds'] = round(result['avg_duration_seconds'], 1)
+
+        for column in ("dominant_emotion", "dominant_posture"):
+            rows = await self.query(f"SELECT {column} AS label, COUNT(*) AS n FROM sessions{where} GROUP BY {column}", params)
+            result[column] = {row['label']: row['n'] for row in rows}
+
+        # Average share of each label per session (sessions without the label count as 0%)
+        rows = await self.query(
+            f"SELECT kind, label, SUM(percent) AS total FROM session_labels "
+            f"WHERE session_id IN (SELECT session_id FROM sessions{where}) GROUP BY kind, label", params
+        )
+        for kind in ("emotion", "posture"):
+            result[f"{kind}_share"] = {
+                row['label']: round(row['total'] / sessions, 1) for row in rows if row['kind'] == kind
+            } if sessions else {}
+        return result
+
+    async def frames(self, session_id, limit=1000, offset=0):
+        rows = await self.query(
+            "SELECT timestamp, emotion, posture, feedback FROM frames WHERE session_id = ? "
+            "ORDER BY timestamp LIMIT ? OFFSET ?", (session_id, limit, offset)
+        )
+        return [dict(row) for row in rows]
+
+analytics_store = None
+
+def get_analytics_store():
+    global analytics_store
+    if analytics_store is None:
+        analytics_store = AnalyticsStore()
+    return analytics_store
+
+def close_analytics_store():
+    if analytics_store is not None:
+        analytics_store.close()
+
+atexit.register(close_analytics_store)
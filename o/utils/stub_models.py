@@ -0,0 +1,43 @@
+#stand-in models with the same call shapes as the real ones; no weights, no downloads
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from utils.backend_utils import EmotionBackend
+from utils.model_utils import override_model
+
+class StubEmotionBackend(EmotionBackend):
+    """Deterministic scores derived from each face's mean intensity."""
+
+    name = "stub"
+
+    def run(self, batch):
+        means = batch.reshape(len(batch), -1).mean(axis=1)
+        scores = np.full((len(batch), 7), 0.05, dtype=np.float32)
+        scores[np.arange(len(batch)), (means * 70).astype(int) % 7] = 0.7
+        return scores
+
+class StubPose:
+    """MediaPipe-style process(): a fixed, upright set of 33 landmarks."""
+
+    def __init__(self, **kwargs):
+        landmarks = [SimpleNamespace(x=0.5, y=0.5, z=0.0, visibility=1.0) for _ in range(33)]
+        landmarks[0] = SimpleNamespace(x=0.5, y=0.3, z=0.0, visibility=1.0)     # nose
+        landmarks[7] = SimpleNamespace(x=0.55, y=0.3, z=0.0, visibility=1.0)    # left ear
+        landmarks[8] = SimpleNamespace(x=0.45, y=0.3, z=0.0, visibility=1.0)    # right ear
+        landmarks[11] = SimpleNamespace(x=0.6, y=0.5, z=0.0, visibility=1.0)    # left shoulder
+        landmarks[12] = SimpleNamespace(x=0.4, y=0.5, z=0.0, visibility=1.0)    # right shoulder
+        self.results = SimpleNamespace(pose_landmarks=SimpleNamespace(landmark=landmarks))
+
+    def process(self, frame):
+        return self.results
+
+    def close(self):
+        pass
+
+def install_stub_models():
+    override_model("emotion", StubEmotionBackend())
+    override_model("pose", StubPose())
+    from utils.pose_utils import pose_estimators   # per-session graphs come from its factory
+    pose_estimators.factory = StubPose
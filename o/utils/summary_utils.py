@@ -1,25 +1,20 @@
-from collections import Counter
 from datetime import datetime
 
 def generate_session_summary(session, end_time):
-    duration = end_time - session['start_time']
+    duration = end_time - session.start_time
     duration_str = str(duration).split('.')[0]
+    stats = session.stats
 
-    # Filter out "No face detected" and "Multiple faces detected" from emotion history
-    filtered_emotions = [
-        emotion for emotion in session['emotion_history'] 
-        if emotion not in ["No face detected", "Multiple faces detected"]
-    ]
-
-    emotion_counts = Counter(filtered_emotions)
-    total_emotions = len(filtered_emotions)
+    # "No face detected" and "Multiple faces detected" are left out of the emotion distribution
+    emotion_counts = stats.emotion_distribution()
+    total_emotions = sum(emotion_counts.values())
     emotion_summary = {
         emotion: round((count / total_emotions) * 100, 1)
         for emotion, count in emotion_counts.items()
     } if total_emotions else {"No data": 100}
 
-    posture_counts = Counter(session['posture_history'])
-    total_postures = len(session['posture_history'])
+    posture_counts = stats.posture_counts
+    total_postures = stats.posture_total
     posture_summary = {
         posture: round((count / total_postures) * 100, 1)
         for posture, count in posture_counts.items()
@@ -29,13 +24,13 @@ def generate_session_summary(session, end_time):
     dominant_posture = max(posture_counts, key=posture_counts.get) if posture_counts else "Unknown"
 
     return {
-        'session_id': session['session_id'],
+        'session_id': session.session_id,
         'duration': duration_str,
-        'total_frames_analyzed': len(session['emotion_history']),
+        'total_frames_analyzed': stats.emotion_total,
         'emotion_summary': emotion_summary,
         'posture_summary': posture_summary,
         'dominant_emotion': dominant_emotion,
         'dominant_posture': dominant_posture,
-        'start_time': session['start_time'].strftime("%Y-%m-%d %H:%M:%S"),
+        'start_time': session.start_time.strftime("%Y-%m-%d %H:%M:%S"),
         'end_time': end_time.strftime("%Y-%m-%d %H:%M:%S")
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,58 @@
+#video uploads: chunked saving, sampled decoding
+
+import asyncio
+
+import cv2
+
+from utils.config_utils import UPLOAD_CHUNK_SIZE, VIDEO_SEEK_MIN_GAP
+
+async def save_upload(file, path, chunk_size=UPLOAD_CHUNK_SIZE):
+    # Chunked read + threaded write keeps a large upload from blocking the loop
+    with open(path, "wb") as buffer:
+        while True:
+            chunk = await file.read(chunk_size)
+            if not chunk:
+                break
+            await asyncio.to_thread(buffer.write, chunk)
+
+def iter_sampled_frames(video_path, sample_seconds, start_seconds=0.0, end_seconds=None):
+    """
+    Yield (frame_index, seconds, frame) every sample_seconds of video, decoding only those frames.
+    Short gaps are skipped with grab() (no colour conversion); long ones seek to the target frame.
+    Streams that ignore seeking (set() can report success without moving) fall back to grab().
+    """
+    cap = cv2.VideoCapture(video_path)
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        if fps == 0:
+            raise ValueError("Could not get video FPS.")
+
+        step = max(1, round(fps * sample_seconds))
+        position = 0
+        seekable = True
+        target = round(start_seconds * fps)
+        last = round(end_seconds * fps) if end_seconds is not None else None
+
+        while last is None or target < last:
+            gap = target - position
+            if seekable and (gap >= VIDEO_SEEK_MIN_GAP or gap < 0):
+                cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+                if cap.get(cv2.CAP_PROP_POS_FRAMES) == target:
+                    gap = 0
+                else:
+                    seekable = False   # still at `position`; grab our way there from now on
+            if gap < 0:
+                raise ValueError(f"Could not seek back to frame {target}.")
+            for _ in range(gap):
+                if not cap.grab():
+                    return
+
+            ret, frame = cap.read()
+            if not ret:
+                return
+            yield target, target / fps, frame
+
+            position = target + 1
+            target += step
+    finally:
+        cap.release()